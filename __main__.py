@@ -5,6 +5,7 @@ import random
 import torch
 
 from optimizer import EvaluationController, OptimizationController
+from optimizer.environment.spark.predictionmodelstore import PredictionModelStore
 
 logger = logging.getLogger(__name__)
 
@@ -17,12 +18,16 @@ def setup_arg_parser() -> argparse.ArgumentParser:
     parser.add_argument('--resource-manager-host', type=str, default='http://omnisky:8088/', help='Address:port of ResourceManager')
     parser.add_argument('--spark-history-server-host', type=str, default='http://omnisky:18080/', help='Address:port of Spark history server')
 
+    parser.add_argument('--scheduler-conf-api', action='store_true', help='Change queues through the RM scheduler-conf mutation API instead of rmadmin -refreshQueues')
+
     parser.add_argument('--seed', type=int, default=123, help='Random seed')
     parser.add_argument('--disable-cuda', action='store_true', help='Disable CUDA')
     parser.add_argument('--game', type=str, default='space_invaders', help='ATARI game')
     parser.add_argument('--T-max', type=int, default=int(6000), metavar='STEPS', help='Number of training steps (4x number of frames)')
-    parser.add_argument('--max-episode-length', type=int, default=int(12), metavar='LENGTH', help='Max episode length (0 to disable)')
+    parser.add_argument('--max-episode-length', type=int, default=int(2880), metavar='LENGTH', help='Max episode length of trace replaying environments (0 to disable)')
     parser.add_argument('--history-length', type=int, default=4, metavar='T', help='Number of consecutive states processed')
+    parser.add_argument('--architecture', type=str, default='canonical', choices=['canonical', 'entity'], help='Network architecture (entity pools the state as sets of apps, nodes and queues)')
+    parser.add_argument('--entity-embedding-size', type=int, default=64, metavar='SIZE', help='Embedding size of every entity of the entity architecture')
     parser.add_argument('--hidden-size', type=int, default=512, metavar='SIZE', help='Network hidden size')
     parser.add_argument('--noisy-std', type=float, default=0.1, metavar='σ', help='Initial standard deviation of noisy linear layers')
     parser.add_argument('--atoms', type=int, default=51, metavar='C', help='Discretised size of value distribution')
@@ -30,23 +35,38 @@ def setup_arg_parser() -> argparse.ArgumentParser:
     parser.add_argument('--V-max', type=float, default=10, metavar='V', help='Maximum of value distribution support')
     parser.add_argument('--model', type=str, metavar='PARAMS', help='Pretrained model (state dict)')
     parser.add_argument('--memory-capacity', type=int, default=int(10000), metavar='CAPACITY', help='Experience replay memory capacity')
+    parser.add_argument('--memory-state-dtype', type=str, default='float32', choices=['float32', 'float16'], help='Storage type of states in replay memory (float16 is lossy)')
     parser.add_argument('--replay-frequency', type=int, default=4, metavar='k', help='Frequency of sampling from memory')
     parser.add_argument('--priority-exponent', type=float, default=0.5, metavar='ω', help='Prioritised experience replay exponent (originally denoted α)')
     parser.add_argument('--priority-weight', type=float, default=0.4, metavar='β', help='Initial prioritised experience replay importance sampling weight')
+    parser.add_argument('--global-weight-normalisation', action='store_true', help='Normalise importance-sampling weights by the minimum priority in memory instead of the batch')
+    parser.add_argument('--prefetch-batches', type=int, default=0, metavar='K', help='Number of batches sampled ahead of learning in the background (0 to disable)')
     parser.add_argument('--multi-step', type=int, default=3, metavar='n', help='Number of steps for multi-step return')
     parser.add_argument('--discount', type=float, default=0.99, metavar='γ', help='Discount factor')
     parser.add_argument('--target-update', type=int, default=int(288), metavar='τ', help='Number of steps after which to update target network')
+    parser.add_argument('--target-update-tau', type=float, default=1.0, metavar='τ', help='Fraction of online weights moved into the target network per update (1 copies them)')
     parser.add_argument('--reward-clip', type=int, default=1, metavar='VALUE', help='Reward clipping (0 to disable)')
     parser.add_argument('--lr', type=float, default=0.0000625, metavar='η', help='Learning rate')
     parser.add_argument('--adam-eps', type=float, default=1.5e-4, metavar='ε', help='Adam epsilon')
     parser.add_argument('--batch-size', type=int, default=32, metavar='SIZE', help='Batch size')
     parser.add_argument('--learn-start', type=int, default=int(900), metavar='STEPS', help='Number of steps before starting training')
     parser.add_argument('--evaluate', action='store_true', help='Evaluate only')
+    parser.add_argument('--serve', action='store_true', help='Act on the cluster with --model without pre-training or learning')
     parser.add_argument('--evaluation-interval', type=int, default=2000, metavar='STEPS', help='Number of training steps between evaluations')
     parser.add_argument('--evaluation-episodes', type=int, default=5, metavar='N', help='Number of evaluation episodes to average over')
     parser.add_argument('--evaluation-size', type=int, default=288, metavar='N', help='Number of transitions to use for validating Q')
     parser.add_argument('--log-interval', type=int, default=288, metavar='STEPS', help='Number of training steps between logging status')
     parser.add_argument('--render', action='store_true', help='Display screen (testing only)')
+    parser.add_argument('--offline-pre-train', action='store_true', help='Pre-train by replaying traces in process instead of running SLS')
+    parser.add_argument('--offline-nodes', type=int, default=2, metavar='N', help='Number of nodes of the cluster replaying traces offline')
+    parser.add_argument('--pre-train-workers', type=int, default=1, metavar='N', help='Number of processes replaying pre-training episodes (needs --offline-pre-train when above 1)')
+    parser.add_argument('--num-envs', type=int, default=1, metavar='N', help='Number of trace replaying environments OptimizationController trains on in parallel instead of the cluster (1 trains on the cluster)')
+    parser.add_argument('--async-learner', action='store_true', help='Learn in a background thread while acting on the cluster')
+    parser.add_argument('--publish-interval', type=int, default=1, metavar='STEPS', help='Number of background learning steps between publishing weights to the actor')
+    parser.add_argument('--frozen-policy', action='store_true', help='Act with a noise-free TorchScript copy of the network on CPU with --serve and in evaluation (training keeps the noisy network to explore)')
+    parser.add_argument('--quantize', action='store_true', help='Quantize linear layers of the frozen policy to int8')
+    parser.add_argument('--build-prediction-models', action='store_true',
+                        help='Crawl prototype applications into the prediction model store and exit')
 
     return parser
 
@@ -80,6 +100,12 @@ def main():
     logging.basicConfig(level=logging.INFO, format='%(message)s')
     args = get_args()
 
+    if args.build_prediction_models:
+        store = PredictionModelStore()
+        store.save(PredictionModelStore.crawl(args.spark_history_server_host + 'api/v1/'))
+        logger.info('Prediction models saved into %s.' % store.filename)
+        return
+
     args.evaluate = False
     if args.evaluate:
         controller = EvaluationController(args)
@@ -87,7 +113,8 @@ def main():
         controller = OptimizationController(args)
 
     try:
-        controller.pre_train_model()
+        if not args.serve:
+            controller.pre_train_model()
         controller.run()
     except KeyboardInterrupt:
         controller.env.close()
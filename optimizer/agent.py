@@ -1,13 +1,14 @@
 import os
 import random
+from typing import List, Optional
 
 import torch
 from torch import optim
 
 from optimizer.environment import AbstractEnv
-from optimizer.nn import DQN
+from optimizer.nn import ARCHITECTURES, FrozenPolicy, soft_update
 from optimizer.replaymemory import ReplayMemoryProxy
-from optimizer.hyperparameters import CUDA_DEVICES
+from optimizer.hyperparameters import CUDA_DEVICES, STATE_SHAPE
 
 
 class Agent(object):
@@ -25,17 +26,23 @@ class Agent(object):
         self.batch_size = args.batch_size
         self.n = args.multi_step
         self.discount = args.discount
-
-        self.online_net = DQN(args, self.action_space).to(device=args.device)
+        self.history_length = args.history_length
+        self.quantize = args.quantize
+        self.target_update_tau = args.target_update_tau
+        self.use_frozen_policy = args.frozen_policy
+        self.frozen_policy: Optional[FrozenPolicy] = None
+
+        dqn_class = ARCHITECTURES[args.architecture]
+        self.online_net = dqn_class(args, self.action_space).to(device=args.device)
         self.online_net = torch.nn.DataParallel(self.online_net, CUDA_DEVICES)
         if args.model and os.path.isfile(args.model):
             # Always load tensors onto CPU by default, will shift to GPU if necessary
             self.online_net.load_state_dict(torch.load(args.model, map_location='cpu'))
         self.online_net.train()
 
-        self.target_net = DQN(args, self.action_space).to(device=args.device)
+        self.target_net = dqn_class(args, self.action_space).to(device=args.device)
         self.target_net = torch.nn.DataParallel(self.target_net, CUDA_DEVICES)
-        self.update_target_net()
+        self.update_target_net(tau=1)
         self.target_net.train()
         for param in self.target_net.parameters():
             param.requires_grad = False
@@ -47,10 +54,19 @@ class Agent(object):
         self.online_net.module.reset_noise()
 
     # Acts based on single state (no batch)
+    # In evaluation mode with --frozen-policy, acts greedily through the frozen copy. Training
+    # keeps acting with the noisy online network, which is how NoisyNet explores.
     def act(self, state):
+        if self.frozen_policy is not None and not self.online_net.training:
+            return self.frozen_policy.act(state)
         with torch.no_grad():
             return (self.online_net(state.unsqueeze(0)) * self.support).sum(2).argmax(1).item()
 
+    # Acts based on a batch of states in one forward pass
+    def act_batch(self, states) -> List[int]:
+        with torch.no_grad():
+            return (self.online_net(states) * self.support).sum(2).argmax(1).tolist()
+
     # Acts with an ε-greedy policy (used for evaluation only)
     # High ε can reduce evaluation scores drastically
     def act_e_greedy(self, state, epsilon=0.001) -> int:
@@ -102,8 +118,14 @@ class Agent(object):
 
         mem.update_priorities(idxs, loss.detach())  # Update priorities of sampled transitions
 
-    def update_target_net(self) -> None:
-        self.target_net.load_state_dict(self.online_net.state_dict())
+    def update_target_net(self, tau: float = None) -> None:
+        """Soft updates the target network in place, τ defaulting to --target-update-tau."""
+        soft_update(self.target_net, self.online_net, self.target_update_tau if tau is None else tau)
+
+    def freeze(self) -> FrozenPolicy:
+        """Export the online network, without noise, for CPU inference."""
+        example_state = torch.zeros(self.history_length, *STATE_SHAPE)
+        return FrozenPolicy(self.online_net.module, self.support, example_state, self.quantize)
 
     # Save model parameters on current device (don't test move model between devices)
     def save(self, path) -> None:
@@ -119,3 +141,6 @@ class Agent(object):
 
     def eval(self):
         self.online_net.eval()
+        # Freeze the latest weights for this evaluation.
+        if self.use_frozen_policy:
+            self.frozen_policy = self.freeze()
@@ -0,0 +1,81 @@
+import copy
+import logging
+import threading
+import time
+
+import torch
+
+from optimizer.agent import Agent
+from optimizer.replaymemory import SynchronizedMemoryProxy
+
+
+class AsyncLearner(threading.Thread):
+    """
+    Trains the agent on replay memory in a background thread.
+
+    The actor never touches the network being trained: it acts with a policy
+    copy, into which the learner publishes online weights every
+    publish_interval updates. So deciding an action costs one forward pass
+    whatever the cost of learning is.
+
+    Like the synchronous loop, the learner updates once per replay_frequency
+    transitions the actor appends, so it neither overfits early memory nor
+    starves the actor of the GIL.
+    """
+
+    # Seconds to wait for transitions before checking whether to stop.
+    WAIT_TIMEOUT = 0.5
+
+    def __init__(self, args, agent: Agent, mem: SynchronizedMemoryProxy):
+        super().__init__(daemon=True)
+        self.agent = agent
+        self.mem = mem
+        self.publish_interval = args.publish_interval
+        self.replay_frequency = args.replay_frequency
+        self.target_update = args.target_update
+        self.log_interval = args.log_interval
+        self.logger = logging.getLogger(__name__)
+
+        self.policy_net = copy.deepcopy(agent.online_net)
+        for param in self.policy_net.parameters():
+            param.requires_grad = False
+        self._policy_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.updates = 0
+
+    # Acts based on single state (no batch) with the latest published weights
+    def act(self, state) -> int:
+        with self._policy_lock, torch.no_grad():
+            return (self.policy_net(state.unsqueeze(0)) * self.agent.support).sum(2).argmax(1).item()
+
+    # Draws a new set of noisy weights for the policy copy
+    def reset_noise(self):
+        with self._policy_lock:
+            self.policy_net.module.reset_noise()
+
+    def publish(self):
+        state_dict = {k: v.clone() for k, v in self.agent.online_net.state_dict().items()}
+        with self._policy_lock:
+            self.policy_net.load_state_dict(state_dict)
+
+    def run(self):
+        start, appended = time.time(), self.mem.appended
+        while not self._stopped.is_set():
+            if not self.mem.wait_appended(appended + self.updates * self.replay_frequency, self.WAIT_TIMEOUT):
+                continue
+            self.agent.reset_noise()  # Draw a new set of noisy weights
+            self.agent.learn(self.mem)  # Train with n-step distributional double-Q learning
+            self.updates += 1
+
+            if self.updates % self.publish_interval == 0:
+                self.publish()
+            # Update target network every target_update transitions, as the synchronous loop does
+            if self.updates % max(self.target_update // self.replay_frequency, 1) == 0:
+                self.agent.update_target_net()
+            if self.updates % self.log_interval == 0:
+                self.logger.info('Learner: %d updates, %.2f updates/s' %
+                                 (self.updates, self.updates / (time.time() - start)))
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
@@ -4,7 +4,7 @@ import logging
 
 from optimizer.agent import Agent
 from optimizer.pretrainer import PreTrainer
-from optimizer.replaymemory import ReplayMemoryProxy
+from optimizer.replaymemory import BatchPrefetcher, ReplayMemoryProxy
 
 
 class AbstractController(object):
@@ -16,6 +16,8 @@ class AbstractController(object):
         self.env = self._env(args)
         self.action_space = self.env.action_space()
         self.mem = ReplayMemoryProxy(self.args, self.args.memory_capacity)
+        if self.args.prefetch_batches > 0:
+            self.mem = BatchPrefetcher(self.mem, self.args, self.args.prefetch_batches)
         self.agent = Agent(self.args, self.env)
         self.priority_weight_increase = (1 - self.args.priority_weight) / (self.args.T_max - self.args.learn_start)
 
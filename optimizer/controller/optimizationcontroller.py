@@ -1,14 +1,26 @@
 import argparse
 import time
 
+from optimizer.asynclearner import AsyncLearner
 from optimizer.controller.abstractcontroller import AbstractController
-from optimizer.environment import Env, StateInvalidException
+from optimizer.environment import Env, StateInvalidException, TraceReplayEnv, VectorEnv
 from optimizer.hyperparameters import TRAIN_LOOP_INTERNAL
+from optimizer.replaymemory import SynchronizedMemoryProxy
 
 
 class OptimizationController(AbstractController):
 
     def run(self):
+        if self.args.serve:
+            self.run_serving()
+            return
+        if self.args.num_envs > 1:
+            self.run_with_vector_env()
+            return
+        if self.args.async_learner:
+            self.run_async()
+            return
+
         env = self.env
         args = self.args
         dqn = self.agent
@@ -55,5 +67,161 @@ class OptimizationController(AbstractController):
 
             state = next_state
 
+    def run_async(self):
+        """
+        Acts every TRAIN_LOOP_INTERNAL seconds while an AsyncLearner trains in the background,
+        so decisions never wait for learning.
+        """
+        env = self.env
+        args = self.args
+        # A prefetching memory is synchronized already.
+        mem = self.mem if isinstance(self.mem, SynchronizedMemoryProxy) else SynchronizedMemoryProxy(self.mem)
+        learner = AsyncLearner(args, self.agent, mem)
+
+        priority_weight_increase = self.priority_weight_increase
+        reward_clip = args.reward_clip
+
+        T, done, next_state = 0, False, None
+        env.reset_buffer()
+        state = env.get_state()
+
+        start, decision_time = time.time(), 0.0
+        while True:
+            step_start = time.time()
+            action = learner.act(state)
+            decision_time += time.time() - step_start
+
+            try:
+                next_state, reward, done = env.step(action)  # Step
+                if reward_clip > 0:
+                    reward = max(min(reward, reward_clip), -reward_clip)  # Clip rewards
+                print(reward, action)
+                mem.append(state, action, reward, done)  # Append transition to memory
+                T += 1
+            except StateInvalidException as e:
+                print(e)
+
+            if done:
+                break
+
+            if T % args.replay_frequency == 0:
+                learner.reset_noise()  # Draw a new set of noisy weights
+
+            if T >= args.learn_start:
+                # Anneal importance sampling weight β to 1
+                mem.priority_weight = min(mem.priority_weight + priority_weight_increase, 1)
+                if not learner.is_alive():
+                    learner.start()
+
+            if T > 0 and T % args.log_interval == 0:
+                self.logger.info('Actor: %d steps, %.2f steps/s, %.2fms per decision' %
+                                 (T, T / (time.time() - start), decision_time / T * 1000))
+
+            # Keep a fixed cadence, whatever the step cost
+            time.sleep(max(TRAIN_LOOP_INTERNAL - (time.time() - step_start), 0))
+            state = next_state
+
+        if learner.is_alive():
+            learner.stop()
+
+    def run_serving(self):
+        """
+        Acts on the cluster without learning, greedily and through the frozen
+        policy with --frozen-policy, logging act() latency every log_interval steps.
+        """
+        env = self.env
+        args = self.args
+        dqn = self.agent
+        dqn.eval()
+
+        T, done = 0, False
+        env.reset_buffer()
+        state = env.get_state()
+        while not done:
+            action = dqn.act(state)
+            try:
+                state, reward, done = env.step(action)  # Step
+                print(reward, action)
+                T += 1
+                if T % args.log_interval == 0 and dqn.frozen_policy is not None:
+                    self.logger.info('act() latency percentiles (ms): %s' % dqn.frozen_policy.latency_percentiles())
+            except StateInvalidException as e:
+                print(e)
+            time.sleep(TRAIN_LOOP_INTERNAL)
+
+        if dqn.frozen_policy is not None:
+            self.logger.info('act() latency percentiles (ms): %s' % dqn.frozen_policy.latency_percentiles())
+
+    def run_with_vector_env(self):
+        """
+        Trains on several trace replaying environments at once instead of the cluster.
+        Transitions of an episode are held until it ends and then appended to memory
+        together, so episodes of different environments never interleave in memory.
+        Only the last frame of each state is held, on CPU, as memory stores no more.
+
+        T counts transitions in memory and only advances when an episode ends. Learning
+        then catches up, so up to max_episode_length / replay_frequency learn() calls run
+        back to back while every environment waits.
+        """
+        args = self.args
+        dqn = self.agent
+        mem = self.mem
+
+        priority_weight_increase = self.priority_weight_increase
+        reward_clip = args.reward_clip
+
+        envs = VectorEnv(TraceReplayEnv, args, args.num_envs)
+        episodes = [[] for _ in range(args.num_envs)]
+        episode_rewards = []
+        states = envs.reset()
+
+        T, start = 0, time.time()
+        while T < args.T_max:
+            last_T = T
+            dqn.reset_noise()  # Draw a new set of noisy weights for every batch of actions
+
+            actions = dqn.act_batch(states)
+            next_states, rewards, dones, invalids = envs.step(actions)
+            for i in range(args.num_envs):
+                if not invalids[i]:
+                    reward = rewards[i]
+                    if reward_clip > 0:
+                        reward = max(min(reward, reward_clip), -reward_clip)  # Clip rewards
+                    # A copy, a view of states would keep the whole batch alive on its device.
+                    frame = states[i][-1].cpu().clone().unsqueeze(0)
+                    episodes[i].append((frame, actions[i], reward, dones[i]))
+
+                if dones[i]:
+                    for transition in episodes[i]:
+                        mem.append(*transition)  # Append transitions of the finished episode to memory
+                    if invalids[i]:
+                        mem.terminate()
+                    T += len(episodes[i])
+                    episode_rewards.append(sum(transition[2] for transition in episodes[i]))
+                    episodes[i].clear()
+
+            if T >= args.learn_start:
+                # Anneal importance sampling weight β to 1
+                mem.priority_weight = min(mem.priority_weight + priority_weight_increase * (T - last_T), 1)
+
+                for _ in range(T // args.replay_frequency - last_T // args.replay_frequency):
+                    dqn.learn(mem)  # Train with n-step distributional double-Q learning
+
+                # Update target network
+                if T // args.target_update != last_T // args.target_update:
+                    dqn.update_target_net()
+
+            if T // args.log_interval != last_T // args.log_interval:
+                self.logger.info('T = %d / %d | %d episodes, avg. reward: %.4f | %.2f transitions/s' %
+                                 (T, args.T_max, len(episode_rewards), sum(episode_rewards) / len(episode_rewards),
+                                  T / (time.time() - start)))
+                episode_rewards.clear()
+            states = next_states
+
+        envs.close()
+
     def _env(self, args: argparse.Namespace):
+        # Training on replayed traces leaves the cluster alone.
+        if args.num_envs > 1:
+            return TraceReplayEnv(args)
         return Env(args)
@@ -72,6 +72,8 @@ class Validator(object):
 
         print('Total Time Cost :', total_time_cost_ms, 'ms')
         print(arr)
+        if dqn.frozen_policy is not None:
+            self.logger.info('act() latency percentiles (ms): %s' % dqn.frozen_policy.latency_percentiles())
         excelutil.list2excel(arr, './results/evaluate_%d.xlsx' % self.evaluate_cnt)
         self.evaluate_cnt += 1
         env.close()
@@ -131,7 +133,7 @@ class Validator(object):
         val_mem = ReplayMemoryProxy(self.args, self.args.evaluation_size)
         memory_serializer = MemorySerializer(val_mem)
 
-        if memory_serializer.try_load_by_filename('./results/validation-replay-memory.pk'):
+        if memory_serializer.try_load_by_filename('./results/validation-replay-memory'):
             self.logger.info('Validation memory setting up finished.')
             return val_mem
 
@@ -154,7 +156,7 @@ class Validator(object):
             state = next_state
             T += 1
 
-        memory_serializer.save_as('./results/validation-replay-memory.pk')
+        memory_serializer.save_as('./results/validation-replay-memory')
 
         self.logger.info('Validation memory setting up finished.')
         return val_mem
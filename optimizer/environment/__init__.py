@@ -3,5 +3,8 @@ from optimizer.environment.env import Env
 from optimizer.environment.evaluationenv import EvaluationEnv
 from optimizer.environment.pretrainenv import PreTrainEnv
 from optimizer.environment.stateinvalidexception import StateInvalidException
+from optimizer.environment.tracereplayenv import TraceReplayEnv
+from optimizer.environment.vectorenv import VectorEnv
 
-__all__ = ['AbstractEnv', 'Env', 'PreTrainEnv', 'EvaluationEnv', 'StateInvalidException']
+__all__ = ['AbstractEnv', 'Env', 'PreTrainEnv', 'EvaluationEnv', 'StateInvalidException', 'TraceReplayEnv',
+           'VectorEnv']
@@ -1,4 +1,5 @@
 import abc
+import logging
 import os
 import subprocess
 from typing import Optional
@@ -7,9 +8,13 @@ import torch
 
 from optimizer.environment.actionparser import ActionParser
 from optimizer.environment.resetablecommunicator import Communicator
+from optimizer.environment.rewardcalculator import RewardCalculator
 from optimizer.environment.yarn.schedulerstrategy import SchedulerStrategyFactory
 from optimizer.environment.yarn.yarnmodel import *
+from optimizer.environment.yarn.queuereconfigurator import QueueReconfigurator
 from optimizer.environment.yarn.statebuilder import StateBuilder
+from optimizer.hyperparameters import RECONFIGURATION_DEBOUNCE
+from optimizer.util.httpclient import HttpClient
 
 
 class AbstractCommunicator(Communicator):
@@ -17,7 +22,8 @@ class AbstractCommunicator(Communicator):
     Uses RESTFul API to communicate with YARN cluster scheduler.
     """
 
-    def __init__(self, rm_host: str, spark_history_server_host: str, hadoop_home: str):
+    def __init__(self, rm_host: str, spark_history_server_host: str, hadoop_home: str,
+                 scheduler_conf_api: bool = False):
         self.HADOOP_HOME = hadoop_home
         self.HADOOP_ETC = hadoop_home + '/etc/hadoop'
         self.RM_API_URL = rm_host
@@ -28,12 +34,23 @@ class AbstractCommunicator(Communicator):
         scheduler_type = self.get_scheduler_type()
         self.scheduler_strategy = SchedulerStrategyFactory.create(
             scheduler_type, rm_host, self.HADOOP_ETC, self.action_set)
-        self.scheduler_strategy.copy_conf_file()
 
-        self.state_builder = StateBuilder(self.RM_API_URL, self.SPARK_HISTORY_SERVER_API_URL, self.scheduler_strategy)
+        self.http_client = HttpClient()
+        self.state_builder = StateBuilder(self.RM_API_URL, self.SPARK_HISTORY_SERVER_API_URL,
+                                          self.scheduler_strategy, self.http_client)
 
         self.state: Optional[State] = None
-        self.last_sum_time_delay: Optional[float] = None
+        self.reward_calculator = RewardCalculator()
+
+        # Mutate queues through RM's scheduler-conf API, falling back to the conf file and rmadmin.
+        self.scheduler_conf_api = scheduler_conf_api
+        self.logger = logging.getLogger(__name__)
+        # Shared by every communicator of this cluster, e.g. those of training and evaluation.
+        self.reconfigurator = QueueReconfigurator.shared(self.HADOOP_HOME, self._apply_queue_config,
+                                                         RECONFIGURATION_DEBOUNCE)
+        self.reconfigurator.reset(self.scheduler_strategy.copy_conf_file)
+        # Whether the queue config of the last action had taken effect when the last state was read.
+        self.config_settled = True
 
     def act(self, action_index: int) -> float:
         """
@@ -43,22 +60,8 @@ class AbstractCommunicator(Communicator):
         self.set_and_refresh_queue_config(action_index)
         return self.get_reward()
 
-    # TODO: Test if we should use function math.tanh to clap the value of reward.
     def get_reward(self) -> float:
-        waiting_jobs = self.state.waiting_apps
-        running_jobs = self.state.running_apps
-
-        # noinspection PyTypeChecker
-        sum_time_delay = sum([j.predicted_time_delay for j in running_jobs])
-
-        # If we just start this program, set the reward as 0.
-        if self.last_sum_time_delay is None or not self.last_sum_time_delay:
-            self.last_sum_time_delay = sum_time_delay
-            return 0
-
-        reward = (self.last_sum_time_delay - sum_time_delay) / self.last_sum_time_delay
-        self.last_sum_time_delay = sum_time_delay
-        return reward
+        return self.reward_calculator.get_reward(self.state)
 
     def get_state(self) -> State:
         """Get raw state of YARN."""
@@ -76,15 +79,28 @@ class AbstractCommunicator(Communicator):
             queue_constraints: [QueueConstraint, QueueConstraint, ...]
         }
         """
+        self.config_settled = self.reconfigurator.is_settled()
+        if not self.config_settled:
+            self.logger.info('State read before queue config took effect, %d refreshes failed in a row.' %
+                             self.reconfigurator.failures)
         self.state = self.get_state()
         return self.state_builder.build_tensor(self.state)
 
     def set_and_refresh_queue_config(self, action_index: int) -> None:
         """
-        Use script "refresh-queues.sh" to refresh the configurations of queues.
+        Hand the action over to the reconfigurator, which applies it in the background
+        unless it is already applied: through the scheduler-conf API if enabled, else by
+        writing the config and running "refresh-queues.sh".
         """
+        self.reconfigurator.submit(action_index)
+
+    def _apply_queue_config(self, action_index: int) -> bool:
+        if self.scheduler_conf_api:
+            if self.scheduler_strategy.mutate_config(action_index, self.http_client):
+                return True
+            self.logger.warning('scheduler-conf mutation failed, refreshing queues from the conf file.')
         self.scheduler_strategy.override_config(action_index)
-        refresh_queues(self.HADOOP_HOME)
+        return refresh_queues(self.HADOOP_HOME) == 0
 
     @abc.abstractmethod
     def is_done(self) -> bool:
@@ -96,8 +112,9 @@ class AbstractCommunicator(Communicator):
         pass
 
     def override_config(self, action_index: int):
-        self.scheduler_strategy.override_config(action_index)
+        self.reconfigurator.write_now(action_index, self.scheduler_strategy.override_config)
 
 
-def refresh_queues(hadoop_home: str):
-    subprocess.Popen([os.path.join(os.getcwd(), 'bin', 'refresh-queues.sh'), hadoop_home])
+def refresh_queues(hadoop_home: str) -> int:
+    """:return: Exit code of "refresh-queues.sh"."""
+    return subprocess.call([os.path.join(os.getcwd(), 'bin', 'refresh-queues.sh'), hadoop_home])
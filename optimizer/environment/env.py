@@ -18,4 +18,5 @@ class Env(AbstractEnv):
 
     def _communicator(self, args: argparse.Namespace):
         return SparkCommunicator(args.resource_manager_host, args.spark_history_server_host,
-                                 args.hadoop_home, args.spark_home, args.java_home)
+                                 args.hadoop_home, args.spark_home, args.java_home,
+                                 args.scheduler_conf_api)
@@ -4,7 +4,9 @@ import pathlib
 import torch
 
 from optimizer.environment.abstractenv import AbstractEnv
+from optimizer.environment.yarn.slstracereplaycommunicator import SlsTraceReplayCommunicator
 from optimizer.environment.yarn.yarnslscommunicator import YarnSlsCommunicator
+from optimizer.hyperparameters import PRE_TRAIN_LOOP_INTERNAL
 
 
 class PreTrainEnv(AbstractEnv):
@@ -41,6 +43,8 @@ class PreTrainEnv(AbstractEnv):
         self.t += 1
 
     def _communicator(self, args: argparse.Namespace):
+        if args.offline_pre_train:
+            return SlsTraceReplayCommunicator(PRE_TRAIN_LOOP_INTERNAL * 1000, num_nodes=args.offline_nodes)
         return YarnSlsCommunicator(args.resource_manager_host, args.spark_history_server_host, args.hadoop_home)
 
     def _reset(self):
@@ -0,0 +1,32 @@
+from typing import Optional
+
+from optimizer.environment.yarn.yarnmodel import State
+
+
+class RewardCalculator(object):
+    """
+    Rewards a state by how much the sum of predicted time delays of
+    running apps shrinks compared to the last state.
+    """
+
+    def __init__(self):
+        self.last_sum_time_delay: Optional[float] = None
+
+    def reset(self):
+        self.last_sum_time_delay = None
+
+    # TODO: Test if we should use function math.tanh to clap the value of reward.
+    def get_reward(self, state: State) -> float:
+        running_jobs = state.running_apps
+
+        # noinspection PyTypeChecker
+        sum_time_delay = sum([j.predicted_time_delay for j in running_jobs])
+
+        # If we just start this program, set the reward as 0.
+        if self.last_sum_time_delay is None or not self.last_sum_time_delay:
+            self.last_sum_time_delay = sum_time_delay
+            return 0
+
+        reward = (self.last_sum_time_delay - sum_time_delay) / self.last_sum_time_delay
+        self.last_sum_time_delay = sum_time_delay
+        return reward
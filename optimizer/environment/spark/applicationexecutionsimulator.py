@@ -1,46 +1,50 @@
+import heapq
 from typing import List
 
 from optimizer.environment.spark import simulationmodel
 
 
 class ApplicationExecutionSimulator(object):
-
-    def __init__(self):
-        self.containers: List[simulationmodel.Container] = []
+    """
+    Event-driven list scheduler.
+    Tasks are assigned in id order, each one to the container which becomes
+    free first (the earlier started container on a tie). Containers are kept
+    in a min-heap keyed by finish time, so assigning a task costs O(log C).
+    """
 
     def simulate(self, container_additions: List[simulationmodel.Container], tasks: List[simulationmodel.Task]):
-        self.containers.clear()
-        container_additions.sort(key=lambda item: item.start_time)
-        container_additions = [c for c in container_additions if c.is_active]
-        if len(container_additions) == 0:
+        heap = self._build_heap(container_additions)
+        if len(heap) == 0:
+            return 0
+
+        for task in sorted(tasks, key=lambda item: item.id):
+            finish_time, i = heap[0]
+            task.current_finish_time = finish_time + task.running_time
+            heapq.heapreplace(heap, (task.current_finish_time, i))
+
+        return max(finish_time for finish_time, _ in heap)
+
+    def simulate_runs(self, container_additions: List[simulationmodel.Container],
+                      task_runs: List[simulationmodel.TaskRun]):
+        """
+        Same as simulate() for tasks given as consecutive runs in id order.
+        No task object is created, memory stays O(containers + runs).
+        """
+        heap = self._build_heap(container_additions)
+        if len(heap) == 0:
             return 0
 
-        tasks.sort(key=lambda item: item.id)
-        container_additions[0].add_tasks(tasks)
-        for addition in container_additions:
-            self.containers.append(addition)
-            self.simulate_step(addition.start_time)
-
-        return self.current_time_delay
-
-    def simulate_step(self, current_time: int):
-        """Predicts the finish time of job"""
-        waiting_tasks = []
-        for c in self.containers:
-            waiting_tasks.extend(c.pop_waiting_tasks(current_time))
-        waiting_tasks.sort(key=lambda item: item.id)
-
-        for task in waiting_tasks:
-            earliest_finish_container = self._get_earliest_finish_container()
-            earliest_finish_container.add_task(task)
-
-    @property
-    def current_time_delay(self):
-        return max([container.finish_time for container in self.containers])
-
-    def _get_earliest_finish_container(self):
-        ret = None
-        for cur in self.containers:
-            if ret is None or ret.finish_time > cur.finish_time:
-                ret = cur
-        return ret
+        heapreplace = heapq.heapreplace
+        for run in task_runs:
+            running_time = run.running_time
+            for _ in range(run.count):
+                finish_time, i = heap[0]
+                heapreplace(heap, (finish_time + running_time, i))
+
+        return max(finish_time for finish_time, _ in heap)
+
+    @staticmethod
+    def _build_heap(container_additions: List[simulationmodel.Container]):
+        containers = sorted([c for c in container_additions if c.is_active], key=lambda item: item.start_time)
+        # Sorted by start time already, which is a valid heap.
+        return [(c.start_time, i) for i, c in enumerate(containers)]
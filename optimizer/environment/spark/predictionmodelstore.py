@@ -0,0 +1,70 @@
+import dataclasses
+import json
+import logging
+from typing import Dict, Optional
+
+from optimizer.hyperparameters import PREDICTION_MODEL_PROTOTYPES
+from optimizer.environment.spark import predictionsparkmodel
+from optimizer.environment.spark.completedsparkapplicationanalyzer import CompletedSparkApplicationAnalyzer
+from optimizer.environment.spark.sparkapplicationbuilder import SparkApplicationBuilder
+from optimizer.util import fileutil
+
+
+class PredictionModelStore(object):
+    """
+    Keeps the prediction models of prototype applications on disk as JSON,
+    so that environments load them in milliseconds instead of crawling
+    Spark History Server and analyzing every prototype on each start.
+    """
+
+    VERSION = 1
+    DEFAULT_FILENAME = './data/prediction-models.json'
+
+    def __init__(self, filename: str = DEFAULT_FILENAME):
+        self.filename = filename
+        self.logger = logging.getLogger(__name__)
+
+    def try_load(self) -> Optional[Dict[str, predictionsparkmodel.Application]]:
+        """
+        Load from the store file.
+        :return: Algorithm type to model, None if the file is missing or of another version.
+        """
+        if not fileutil.file_exists(self.filename):
+            self.logger.info('Prediction model store %s doesn\'t exist.' % self.filename)
+            return None
+
+        with open(self.filename) as f:
+            data = json.load(f)
+
+        if data.get('version') != self.VERSION:
+            self.logger.info('Prediction model store %s is of version %s, expected %d.' % (
+                self.filename, data.get('version'), self.VERSION))
+            return None
+
+        return {algorithm_type: self._model_from_dict(d) for algorithm_type, d in data['models'].items()}
+
+    def save(self, models: Dict[str, predictionsparkmodel.Application]):
+        data = {
+            'version': self.VERSION,
+            'models': {algorithm_type: dataclasses.asdict(model) for algorithm_type, model in models.items()}
+        }
+        with open(self.filename, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+    @staticmethod
+    def crawl(spark_history_server_api_url: str,
+              prototypes: Dict[str, str] = None) -> Dict[str, predictionsparkmodel.Application]:
+        """Builds models by analyzing prototype applications on Spark History Server."""
+        builder = SparkApplicationBuilder(spark_history_server_api_url)
+        analyzer = CompletedSparkApplicationAnalyzer()
+
+        models = {}
+        for algorithm_type, application_id in (prototypes or PREDICTION_MODEL_PROTOTYPES).items():
+            app = builder.build(application_id)
+            models[algorithm_type] = analyzer.analyze(app)
+        return models
+
+    @staticmethod
+    def _model_from_dict(d: dict) -> predictionsparkmodel.Application:
+        stages = [predictionsparkmodel.Stage(**s) for s in d['stages']]
+        return predictionsparkmodel.Application(d['name'], d['average_action_process_rates'], stages)
@@ -9,6 +9,13 @@ class Task(object):
     current_finish_time: int = -1
 
 
+@dataclasses.dataclass
+class TaskRun(object):
+    """count tasks in a row sharing the same running time, e.g. the full blocks of a stage."""
+    count: int
+    running_time: float
+
+
 @dataclasses.dataclass
 class Container(object):
 
@@ -1,11 +1,23 @@
+from typing import Dict, List, Optional
+
 from optimizer.environment.spark import sparkmodel
-from optimizer.util import jsonutil, timeutil
+from optimizer.util import timeutil
+from optimizer.util.httpclient import HttpClient
 
 
 class SparkApplicationBuilder(object):
+    """
+    Crawls an application from Spark History Server.
+    Stages and their task lists are fetched concurrently, bounded by the
+    worker pool of the HTTP client, and task lists are paged so that huge
+    stages never arrive as one JSON document.
+    """
 
-    def __init__(self, spark_history_server_api_url):
+    def __init__(self, spark_history_server_api_url, http_client: Optional[HttpClient] = None,
+                 max_parallelism: int = 8, task_page_size: int = 1000):
         self.spark_history_server_api_url = spark_history_server_api_url
+        self.http_client = http_client or HttpClient(max_workers=max_parallelism)
+        self.task_page_size = task_page_size
         self.application_id = None
 
     def build(self, application_id: str):
@@ -14,13 +26,24 @@ class SparkApplicationBuilder(object):
 
     # noinspection PyTypeChecker
     def parse_and_build_application(self):
-        application_url = self.spark_history_server_api_url + 'applications/%s/1/' % self.application_id
-        application_json = jsonutil.get_json(application_url)
-        start_time = timeutil.convert_str_to_timestamp(application_json['startTime'])
+        responses = self.http_client.get_json_concurrently({
+            'application': self._application_url(''),
+            'jobs': self._application_url('jobs'),
+            'executors': self._application_url('allexecutors'),
+        })
+        start_time = timeutil.convert_str_to_timestamp(responses['application']['startTime'])
+
+        jobs_json = responses['jobs']
+        stage_ids = sorted({stage_id for job_json in jobs_json for stage_id in job_json['stageIds']})
+        stages_json = self.http_client.get_json_concurrently(
+            {stage_id: self._application_url('stages/%s' % stage_id) for stage_id in stage_ids})
+        task_lists_json = self._crawl_task_lists(stages_json)
+        stages = {
+            stage_id: self.parse_and_build_stage(stages_json[stage_id], task_lists_json[stage_id])
+            for stage_id in stage_ids
+        }
 
-        jobs_url = self.spark_history_server_api_url + 'applications/%s/1/jobs' % self.application_id
-        jobs_json = jsonutil.get_json(jobs_url)
-        jobs = [self.parse_and_build_job(job_json) for job_json in jobs_json]
+        jobs = [self.parse_and_build_job(job_json, stages) for job_json in jobs_json]
         jobs.reverse()
 
         try:
@@ -28,42 +51,61 @@ class SparkApplicationBuilder(object):
         except IndexError:
             input_bytes = 0
 
-        executors_url = self.spark_history_server_api_url + 'applications/%s/1/allexecutors' % self.application_id
-        executors_json = jsonutil.get_json(executors_url)
-        executors = [
+        executors = self.build_executors_from_json(responses['executors'])
+
+        return sparkmodel.Application(self.application_id, start_time, jobs, executors, input_bytes)
+
+    def build_executors(self, application_id: str) -> List[sparkmodel.Executor]:
+        """Only fetches the executors of an application, which costs one request."""
+        self.application_id = application_id
+        return self.parse_and_build_executors()
+
+    def parse_and_build_executors(self) -> List[sparkmodel.Executor]:
+        executors_json = self.http_client.get_json(self._application_url('allexecutors'))
+        return self.build_executors_from_json(executors_json)
+
+    def build_executors_from_json(self, executors_json) -> List[sparkmodel.Executor]:
+        return [
             self.parse_and_build_executor(executor_json)
             for executor_json in executors_json if executor_json['id'] != 'driver'
         ]
 
-        return sparkmodel.Application(self.application_id, start_time, jobs, executors, input_bytes)
-
-    def parse_and_build_job(self, j):
+    @staticmethod
+    def parse_and_build_job(j, stages: Dict[int, sparkmodel.Stage]):
         job_id = j['jobId']
         name = j['name']
-        stage_ids = j['stageIds']
-        stages = []
-        for stage_id in stage_ids:
-            stage_url = self.spark_history_server_api_url + 'applications/%s/1/stages/%s' % (
-                self.application_id, stage_id)
-            stage_json = jsonutil.get_json(stage_url)
-            stage = self.parse_and_build_stage(stage_json)
-            stages.append(stage)
-        stages.sort(key=lambda s: s.stage_id)
-        return sparkmodel.Job(job_id, name, stages)
-
-    def parse_and_build_stage(self, j):
+        job_stages = [stages[stage_id] for stage_id in j['stageIds']]
+        job_stages.sort(key=lambda s: s.stage_id)
+        return sparkmodel.Job(job_id, name, job_stages)
+
+    def parse_and_build_stage(self, j, tasks_json):
         j = j[0]
         stage_id = j['stageId']
         num_tasks = j['numTasks']
         input_bytes = j['inputBytes']
         name = j['name']
-        tasks_url = self.spark_history_server_api_url + 'applications/%s/1/stages/%s/0/taskList' % (
-            self.application_id, stage_id)
-        tasks_json = jsonutil.get_json(tasks_url)
         tasks = [self.parse_and_build_task(task_json) for task_json in tasks_json]
 
         return sparkmodel.Stage(stage_id, num_tasks, input_bytes, name, tasks)
 
+    def _crawl_task_lists(self, stages_json: Dict[int, list]) -> Dict[int, list]:
+        """Fetches every page of every task list at once and joins the pages in order."""
+        urls = {}
+        for stage_id, j in stages_json.items():
+            num_tasks = j[0]['numTasks']
+            for offset in range(0, max(num_tasks, 1), self.task_page_size):
+                urls[(stage_id, offset)] = self._application_url('stages/%s/0/taskList?offset=%d&length=%d' % (
+                    stage_id, offset, self.task_page_size))
+        pages = self.http_client.get_json_concurrently(urls)
+
+        task_lists = {stage_id: [] for stage_id in stages_json}
+        for stage_id, offset in sorted(pages):
+            task_lists[stage_id].extend(pages[(stage_id, offset)])
+        return task_lists
+
+    def _application_url(self, path: str) -> str:
+        return self.spark_history_server_api_url + 'applications/%s/1/%s' % (self.application_id, path)
+
     @staticmethod
     def parse_and_build_task(j):
         task_id = j['taskId']
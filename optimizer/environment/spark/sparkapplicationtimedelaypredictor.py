@@ -1,54 +1,84 @@
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 from optimizer.environment.spark import predictionsparkmodel, simulationmodel, sparkmodel
 from optimizer.environment.spark.applicationexecutionsimulator import ApplicationExecutionSimulator
 from optimizer.environment.spark.sparkapplicationbuilder import SparkApplicationBuilder
+from optimizer.util.lrucache import LruCache
 
 
 class SparkApplicationTimeDelayPredictor(object):
 
-    def __init__(self, spark_history_server_api_url: str):
+    def __init__(self, spark_history_server_api_url: str, cache_size: int = 1024, cache_ttl: float = 600):
         self.spark_history_server_api_url = spark_history_server_api_url
         self.spark_application_builder = SparkApplicationBuilder(self.spark_history_server_api_url)
         self.simulator = ApplicationExecutionSimulator()
 
         self.models: Dict[str, predictionsparkmodel.Application] = {}
-        self.task_id = 0
+
+        # Input bytes of an application never change once its first stage has started,
+        # so later predictions only need to fetch the executors.
+        self.input_bytes_cache = LruCache(cache_size)
+        # (application id, algorithm, input bytes, executor fingerprint) -> prediction
+        self.prediction_cache = LruCache(cache_size, cache_ttl)
 
     def add_algorithm(self, algorithm_type: str, model: predictionsparkmodel.Application):
         self.models[algorithm_type] = model
+        self.prediction_cache.clear()
 
     def predict(self, application_id: str, algorithm_type: str) -> int:
-        app = self.spark_application_builder.build(application_id)
-        return self._predict(algorithm_type, app.input_bytes, app.executors)
+        input_bytes = self.input_bytes_cache.get(application_id)
+        if input_bytes is None:
+            app = self.spark_application_builder.build(application_id)
+            input_bytes, executors = app.input_bytes, app.executors
+            if input_bytes:
+                self.input_bytes_cache.put(application_id, input_bytes)
+        else:
+            executors = self.spark_application_builder.build_executors(application_id)
+
+        key = (application_id, algorithm_type, input_bytes, self._fingerprint(executors))
+        prediction = self.prediction_cache.get(key)
+        if prediction is None:
+            prediction = self._predict(algorithm_type, input_bytes, executors)
+            self.prediction_cache.put(key, prediction)
+        return prediction
+
+    def cache_info(self) -> Dict[str, int]:
+        return {
+            'crawl_hits': self.input_bytes_cache.hits,
+            'crawl_misses': self.input_bytes_cache.misses,
+            'prediction_hits': self.prediction_cache.hits,
+            'prediction_misses': self.prediction_cache.misses,
+        }
+
+    @staticmethod
+    def _fingerprint(executors: List[sparkmodel.Executor]) -> Tuple[Tuple[int, int, bool], ...]:
+        return tuple(sorted((e.executor_id, e.start_time, e.is_active) for e in executors))
 
     def _predict(self, algorithm_type: str, input_bytes: int, executors: List[sparkmodel.Executor]) -> int:
-        self.task_id = 0
         model = self.models[algorithm_type]
 
-        tasks = self._build_tasks(input_bytes, model)
+        task_runs = self._build_task_runs(input_bytes, model)
         containers = self._build_containers(executors)
-        return self.simulator.simulate(containers, tasks)
+        return self.simulator.simulate_runs(containers, task_runs)
 
-    def _build_tasks(self, input_bytes: int, model: predictionsparkmodel.Application):
-        tasks = []
+    @staticmethod
+    def _build_task_runs(input_bytes: int, model: predictionsparkmodel.Application) -> List[simulationmodel.TaskRun]:
+        """Each stage is a run of full blocks followed by at most one task of the remaining bytes."""
+        task_runs = []
         for stage in model.stages:
-            stage_name = stage.name
             block_size = stage.block_size
             stage_input_bytes = input_bytes * stage.input_ratio
             num_tasks = int(stage_input_bytes / block_size)
-            process_rate = model.average_action_process_rates[stage_name]
+            process_rate = model.average_action_process_rates[stage.name]
 
-            for _ in range(num_tasks):
-                tasks.append(simulationmodel.Task(self.task_id, block_size / process_rate))
-                self.task_id += 1
+            if num_tasks:
+                task_runs.append(simulationmodel.TaskRun(num_tasks, block_size / process_rate))
 
             last_task_input_bytes = stage_input_bytes % block_size
             if last_task_input_bytes:
-                tasks.append(simulationmodel.Task(self.task_id, last_task_input_bytes / process_rate))
-                self.task_id += 1
+                task_runs.append(simulationmodel.TaskRun(1, last_task_input_bytes / process_rate))
 
-        return tasks
+        return task_runs
 
     @staticmethod
     def _build_containers(executors: List[sparkmodel.Executor]):
@@ -12,8 +12,8 @@ from optimizer.util import processutil, jsonutil
 class SparkCommunicator(AbstractCommunicator, ResetableCommunicator):
 
     def __init__(self, rm_host: str, spark_history_server_host: str,
-                 hadoop_home: str, spark_home: str, java_home: str):
-        super().__init__(rm_host, spark_history_server_host, hadoop_home)
+                 hadoop_home: str, spark_home: str, java_home: str, scheduler_conf_api: bool = False):
+        super().__init__(rm_host, spark_history_server_host, hadoop_home, scheduler_conf_api)
         self.SPARK_HOME = spark_home
         self.JAVA_HOME = java_home
         self.workload_runner = SparkWorkloadController()
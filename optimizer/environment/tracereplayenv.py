@@ -0,0 +1,48 @@
+import argparse
+import random
+from typing import Tuple
+
+import torch
+
+from optimizer.environment.abstractenv import AbstractEnv
+from optimizer.environment.yarn.slstracereplaycommunicator import SlsTraceReplayCommunicator
+from optimizer.hyperparameters import PRE_TRAIN_LOOP_INTERNAL
+
+
+class TraceReplayEnv(AbstractEnv):
+    """
+    Simulated environment which replays a random training set trace per episode
+    offline, so several of them can be stepped side by side. An episode ends
+    with its trace or after max_episode_length steps (0 to disable).
+    """
+
+    TRAIN_SET = 'data/trainingset'
+    NUM_FILES = 24
+
+    def __init__(self, args: argparse.Namespace):
+        super().__init__(args)
+        self.random = random.Random(args.seed)
+        self.max_episode_length = args.max_episode_length
+        self.steps = 0
+
+    def reset(self) -> torch.Tensor:
+        file_index = self.random.randrange(self.NUM_FILES)
+        self.communicator.set_dataset("{}/sls-jobs{}.json".format(self.TRAIN_SET, file_index))
+        self.reset_buffer()
+        self.communicator.reset()
+        self.steps = 0
+        return self.get_state()
+
+    # Return state, reward, done
+    def step(self, action: int) -> Tuple[torch.Tensor, float, bool]:
+        state = self.get_state()
+        reward = self.communicator.act(action)
+        self.steps += 1
+        done = self.communicator.is_done() or 0 < self.max_episode_length <= self.steps
+        return state, reward, done
+
+    def close(self) -> None:
+        self.communicator.close()
+
+    def _communicator(self, args: argparse.Namespace):
+        return SlsTraceReplayCommunicator(PRE_TRAIN_LOOP_INTERNAL * 1000, num_nodes=args.offline_nodes)
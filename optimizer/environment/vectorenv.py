@@ -0,0 +1,113 @@
+import argparse
+import multiprocessing
+import traceback
+from typing import List, Tuple, Type
+
+import torch
+
+from optimizer.environment.abstractenv import AbstractEnv
+from optimizer.environment.stateinvalidexception import StateInvalidException
+
+
+class VectorEnv(object):
+    """
+    Steps several environments of one class, each in its own process.
+
+    States of all environments are returned as one batch, so the agent can
+    choose their actions in a single forward pass. An environment whose episode
+    ends, normally or with StateInvalidException, is reset right away and its
+    next state is the first state of the new episode.
+    """
+
+    def __init__(self, env_class: Type[AbstractEnv], args: argparse.Namespace, num_envs: int):
+        self.num_envs = num_envs
+        self.device = args.device
+
+        ctx = multiprocessing.get_context('spawn')
+        self.remotes, self.processes = [], []
+        for index in range(num_envs):
+            env_args = argparse.Namespace(**vars(args))
+            # Workers build states on CPU, they are batched onto the device here.
+            env_args.device = torch.device('cpu')
+            env_args.seed = args.seed + index
+            remote, worker_remote = ctx.Pipe()
+            process = ctx.Process(target=_work, args=(worker_remote, env_class, env_args), daemon=True)
+            process.start()
+            worker_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+
+    def reset(self) -> torch.Tensor:
+        return self._stack([self._receive(remote) for remote in self._send('reset')])
+
+    def step(self, actions: List[int]) -> Tuple[torch.Tensor, List[float], List[bool], List[bool]]:
+        """
+        :return: states, rewards, dones and whether each episode ended with StateInvalidException.
+        """
+        results = [self._receive(remote) for remote in self._send('step', actions)]
+        states, rewards, dones, invalids = zip(*results)
+        return self._stack(states), list(rewards), list(dones), list(invalids)
+
+    def action_space(self) -> int:
+        remote = self.remotes[0]
+        remote.send(('action_space', None))
+        return self._receive(remote)
+
+    def close(self) -> None:
+        for remote in self._send('close'):
+            self._receive(remote)
+            remote.close()
+        for process in self.processes:
+            process.join()
+
+    def _send(self, command: str, data: list = None) -> list:
+        for index, remote in enumerate(self.remotes):
+            remote.send((command, None if data is None else data[index]))
+        return self.remotes
+
+    @staticmethod
+    def _receive(remote):
+        ok, result = remote.recv()
+        if not ok:
+            raise RuntimeError('Environment worker failed:\n%s' % result)
+        return result
+
+    def _stack(self, states) -> torch.Tensor:
+        return torch.stack(states, 0).to(self.device)
+
+
+def _work(remote, env_class: Type[AbstractEnv], args: argparse.Namespace):
+    # One process per environment already, avoid oversubscribing cores with intra-op threads.
+    torch.set_num_threads(1)
+    env = None
+    while True:
+        command, data = remote.recv()
+        try:
+            if env is None:
+                env = env_class(args)
+
+            if command == 'reset':
+                result = env.reset()
+            elif command == 'step':
+                result = _step(env, data)
+            elif command == 'action_space':
+                result = env.action_space()
+            else:
+                env.close()
+                remote.send((True, None))
+                break
+            remote.send((True, result))
+        except Exception:
+            remote.send((False, traceback.format_exc()))
+
+
+def _step(env: AbstractEnv, action: int):
+    try:
+        state, reward, done = env.step(action)
+        invalid = False
+    except StateInvalidException:
+        state, reward, done, invalid = None, 0.0, True, True
+
+    if done:
+        state = env.reset()
+    return state, reward, done, invalid
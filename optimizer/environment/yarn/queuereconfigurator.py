@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class QueueReconfigurator(object):
+    """
+    Applies queue configurations in a background thread.
+
+    submit() returns at once. An action equal to the one applied or about to
+    be applied is a no-op. Actions submitted within debounce seconds of each
+    other, or while a refresh runs, are coalesced so only the latest is
+    applied. apply(action_index) writes the configuration and refreshes the
+    queues, returning whether the refresh succeeded. A failed refresh is
+    retried after a delay doubling up to max_retry_delay seconds.
+
+    Configurations written by other means go through write_now() or reset(),
+    which never overlap with apply().
+
+    Communicators of one cluster share its reconfigurator through shared(),
+    so a single thread writes the queue config of the cluster and
+    applied_action_index is what the cluster actually runs.
+    """
+
+    _shared: Dict[str, 'QueueReconfigurator'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, apply: Callable[[int], bool], debounce: float, max_retry_delay: float = 60.0):
+        self.apply = apply
+        self.debounce = debounce
+        self.max_retry_delay = max_retry_delay
+        self.logger = logging.getLogger(__name__)
+
+        self.applied_action_index: Optional[int] = None
+        self.applied_time: Optional[float] = None
+        self.refreshes = 0
+        self.failures = 0
+        self._pending_action_index: Optional[int] = None
+        # The pending action is applied no earlier than this time.
+        self._apply_time = 0.0
+        self._condition = threading.Condition()
+        # Held while a configuration is being written.
+        self._apply_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def shared(cls, cluster: str, apply: Callable[[int], bool], debounce: float) -> 'QueueReconfigurator':
+        """The reconfigurator of a cluster, created with apply on first use."""
+        with cls._shared_lock:
+            if cluster not in cls._shared:
+                cls._shared[cluster] = cls(apply, debounce)
+            return cls._shared[cluster]
+
+    def submit(self, action_index: int) -> None:
+        with self._condition:
+            if action_index == (self.applied_action_index if self._pending_action_index is None
+                                else self._pending_action_index):
+                return
+            self._pending_action_index = action_index
+            self._apply_time = time.time() + self.debounce
+            self.failures = 0
+            self._condition.notify()
+
+    def write_now(self, action_index: int, write: Callable[[int], None]) -> None:
+        """
+        Writes a configuration by other means, e.g. before YARN starts, after any apply()
+        in progress, and records it as applied.
+        """
+        with self._apply_lock:
+            write(action_index)
+            self._mark_applied(action_index)
+
+    def reset(self, write: Callable[[], None]) -> None:
+        """Writes a configuration which is no action, e.g. the default one, after any apply() in progress."""
+        with self._apply_lock:
+            write()
+            with self._condition:
+                self.applied_action_index = None
+                self.applied_time = time.time()
+
+    def mark_applied(self, action_index: int) -> None:
+        """Records a configuration applied by other means."""
+        with self._apply_lock:
+            self._mark_applied(action_index)
+
+    def _mark_applied(self, action_index: int) -> None:
+        with self._condition:
+            self._pending_action_index = None
+            self.applied_action_index = action_index
+            self.applied_time = time.time()
+            self._condition.notify_all()
+
+    def is_settled(self) -> bool:
+        """Whether the latest submitted action has taken effect."""
+        with self._condition:
+            return self._pending_action_index is None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits until the latest submitted action has taken effect, :return: whether it has."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending_action_index is None, timeout)
+
+    def _work(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending_action_index is not None)
+                # Wait until no action is submitted for debounce seconds, or the retry delay passes.
+                while time.time() < self._apply_time:
+                    self._condition.wait(self._apply_time - time.time())
+                action_index = self._pending_action_index
+            if action_index is None:
+                continue
+
+            with self._apply_lock:
+                with self._condition:
+                    # Skip an action superseded by one written meanwhile.
+                    if self._pending_action_index != action_index:
+                        continue
+                start = time.time()
+                succeeded = self.apply(action_index)
+                self.logger.info('Queue config %d applied in %.2fs%s' %
+                                 (action_index, time.time() - start, '' if succeeded else ', refresh failed'))
+
+                with self._condition:
+                    self.refreshes += 1
+                    if succeeded:
+                        self.applied_action_index = action_index
+                        self.applied_time = time.time()
+                        if self._pending_action_index == action_index:
+                            self._pending_action_index = None
+                            self._condition.notify_all()
+                    elif self._pending_action_index == action_index:
+                        # Retry with backoff unless another action comes in.
+                        self.failures += 1
+                        delay = min(self.debounce * 2 ** self.failures, self.max_retry_delay)
+                        self._apply_time = time.time() + delay
+                        self.logger.warning('Retrying queue config %d in %.2fs.' % (action_index, delay))
@@ -0,0 +1,55 @@
+import zlib
+from typing import Dict, List
+
+from optimizer.hyperparameters import QUEUES
+
+
+class QueueRegistry(object):
+    """
+    Maps queue names to the indices encoded into states, with a dict built once.
+
+    Configured queues may be nested, e.g. "root.a.b" or "a.b", and are found by
+    their full path with or without "root." as well as by their leaf name when
+    that is unique. Unknown queues map to one of UNKNOWN_BUCKETS indices after
+    the configured ones, picked by a CRC of the name so it is stable across runs.
+    """
+
+    ROOT = 'root'
+    UNKNOWN_BUCKETS = 16
+
+    def __init__(self, queue_names: List[str]):
+        self.paths: List[str] = [self._normalize(name) for name in queue_names]
+        self._indices: Dict[str, int] = {}
+        leaf_counts: Dict[str, int] = {}
+        for path in self.paths:
+            leaf = path.rsplit('.', 1)[-1]
+            leaf_counts[leaf] = leaf_counts.get(leaf, 0) + 1
+
+        for index, path in enumerate(self.paths):
+            self._indices[path] = index
+            self._indices['%s.%s' % (self.ROOT, path)] = index
+            leaf = path.rsplit('.', 1)[-1]
+            if leaf_counts[leaf] == 1:
+                self._indices.setdefault(leaf, index)
+
+    def __len__(self):
+        return len(self.paths) + self.UNKNOWN_BUCKETS
+
+    def index(self, queue_name: str) -> int:
+        index = self._indices.get(queue_name)
+        if index is None:
+            index = len(self.paths) + zlib.crc32(self._normalize(queue_name).encode('utf-8')) % self.UNKNOWN_BUCKETS
+            # Remember every name seen, clusters have a bounded number of queues.
+            self._indices[queue_name] = index
+        return index
+
+    def path(self, queue_name: str) -> str:
+        """:return: Full path of a queue from root, as used by capacity scheduler keys."""
+        return '%s.%s' % (self.ROOT, self._normalize(queue_name))
+
+    def _normalize(self, queue_name: str) -> str:
+        prefix = self.ROOT + '.'
+        return queue_name[len(prefix):] if queue_name.startswith(prefix) else queue_name
+
+
+QUEUE_REGISTRY = QueueRegistry(QUEUES['names'])
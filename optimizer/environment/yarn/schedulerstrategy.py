@@ -1,9 +1,16 @@
 import copy
+import logging
 import os
+import time
+from typing import Optional
 
+import requests
+
+from optimizer.environment.yarn.queueregistry import QUEUE_REGISTRY
 from optimizer.environment.yarn.yarnmodel import *
 from optimizer.util import fileutil, jsonutil
-from optimizer.util.xmlmodifier import XmlModifier
+from optimizer.util.httpclient import HttpClient
+from optimizer.util.xmlmodifier import XmlModifier, XmlTemplate
 
 
 class ISchedulerStrategy(object):
@@ -18,9 +25,26 @@ class ISchedulerStrategy(object):
     def copy_conf_file(self):
         pass
 
+    def mutate_config(self, action_index: int, http_client: HttpClient) -> bool:
+        """
+        Apply the queue config of an action through RM's scheduler-conf mutation API.
+        :return: Whether RM accepted it, False if this scheduler cannot be mutated.
+        """
+        return False
+
     def get_queue_constraints(self) -> List[QueueConstraint]:
         pass
 
+    def get_queue_constraints_url(self) -> Optional[str]:
+        """
+        RM endpoint the queue constraints are built from,
+        None if they are not read from RM.
+        """
+        return None
+
+    def build_queue_constraints_from_json(self, j: dict) -> List[QueueConstraint]:
+        return self.get_queue_constraints()
+
 
 class FairSchedulerStrategy(ISchedulerStrategy):
 
@@ -50,43 +74,95 @@ class FairSchedulerStrategy(ISchedulerStrategy):
 
 class CapacitySchedulerStrategy(ISchedulerStrategy):
 
+    # TODO: edit this
+    MAXIMUM_CAPACITY = 80
+
+    TEMPLATE = './data/capacity-scheduler-template.xml'
+
+    UPDATE_QUEUE_XML = '<update-queue><queue-name>%s</queue-name><params>' \
+                       '<entry><key>capacity</key><value>%s</value></entry>' \
+                       '<entry><key>maximum-capacity</key><value>%s</value></entry>' \
+                       '</params></update-queue>'
+
     def __init__(self, rm_host, hadoop_etc, action_set):
         self.RM_HOST = rm_host
         self.HADOOP_ETC = hadoop_etc
-        self.action_set = self._convert_weight_to_capacity(action_set)
+        self.action_set = self.convert_weight_to_capacity(action_set)
+        self.template: Optional[XmlTemplate] = None
+        # Seconds every scheduler-conf mutation took
+        self.mutation_latencies: List[float] = []
+        self.logger = logging.getLogger(__name__)
 
     def override_config(self, action_index: int):
-        dest = os.path.join(self.HADOOP_ETC, 'capacity-scheduler.xml')
-        xml_modifier = XmlModifier('./data/capacity-scheduler-template.xml', dest)
-
-        action: dict = self.action_set[action_index]
-        for queue_name, capacity in action.items():
-            xml_modifier.modify_kv_type('yarn.scheduler.capacity.root.%s.capacity' % queue_name, capacity)
-            # TODO: edit this
-            xml_modifier.modify_kv_type('yarn.scheduler.capacity.root.%s.maximum-capacity' % queue_name, 80)
+        if self.template is None:
+            queue_names = next(iter(self.action_set.values())).keys()
+            self.template = XmlTemplate(self.TEMPLATE, [key for queue_name in queue_names
+                                                        for key in self._queue_keys(queue_name)])
+
+        values = {}
+        for queue_name, capacity in self.action_set[action_index].items():
+            capacity_key, maximum_capacity_key = self._queue_keys(queue_name)
+            values[capacity_key], values[maximum_capacity_key] = capacity, self.MAXIMUM_CAPACITY
+
+        with open(os.path.join(self.HADOOP_ETC, 'capacity-scheduler.xml'), 'w') as f:
+            f.write(self.template.render(values))
+
+    def mutate_config(self, action_index: int, http_client: HttpClient) -> bool:
+        updates = []
+        for queue_name, capacity in self.action_set[action_index].items():
+            updates.append(self.UPDATE_QUEUE_XML % (QUEUE_REGISTRY.path(queue_name), capacity, self.MAXIMUM_CAPACITY))
+        body = '<sched-conf>%s</sched-conf>' % ''.join(updates)
+
+        start = time.time()
+        try:
+            r = http_client.put(self.RM_HOST + 'ws/v1/cluster/scheduler-conf', body,
+                                {'Content-Type': 'application/xml'})
+            succeeded = r.ok
+            detail = r.text.strip()
+        except requests.exceptions.RequestException as e:
+            succeeded, detail = False, repr(e)
+        self.mutation_latencies.append(time.time() - start)
+        self.logger.info('scheduler-conf mutation to action %d took %.3fs: %s' %
+                         (action_index, self.mutation_latencies[-1], detail))
+        return succeeded
 
-        xml_modifier.save()
+    @staticmethod
+    def _queue_keys(queue_name: str):
+        path = QUEUE_REGISTRY.path(queue_name)
+        return ('yarn.scheduler.capacity.%s.capacity' % path,
+                'yarn.scheduler.capacity.%s.maximum-capacity' % path)
 
     def copy_conf_file(self):
         fileutil.file_copy('./data/capacity-scheduler.xml', self.HADOOP_ETC + '/capacity-scheduler.xml')
 
     def get_queue_constraints(self):
-        url = self.RM_HOST + 'ws/v1/cluster/scheduler'
-        conf = jsonutil.get_json(url)
+        conf = jsonutil.get_json(self.get_queue_constraints_url())
+        return self.build_queue_constraints_from_json(conf)
+
+    def get_queue_constraints_url(self):
+        return self.RM_HOST + 'ws/v1/cluster/scheduler'
 
+    def build_queue_constraints_from_json(self, j: dict):
         ret = []
-        queues = conf['scheduler']['schedulerInfo']['queues']['queue']
+        self._build_leaf_queue_constraints(j['scheduler']['schedulerInfo']['queues']['queue'], QUEUE_REGISTRY.ROOT, ret)
+        return ret
+
+    def _build_leaf_queue_constraints(self, queues: List[dict], parent_path: str, ret: List[QueueConstraint]):
+        """Walks nested queues, leaf queues are named by their full path."""
         for q in queues:
-            name = q['queueName']
+            path = q.get('queuePath') or '%s.%s' % (parent_path, q['queueName'])
+            children = (q.get('queues') or {}).get('queue')
+            if children:
+                self._build_leaf_queue_constraints(children, path, ret)
+                continue
+
             capacity = q['capacity']
             used_capacity = q['usedCapacity']
             max_capacity = q['maxCapacity']
-            ret.append(QueueConstraint(name, used_capacity, capacity, max_capacity))
-
-        return ret
+            ret.append(QueueConstraint(path, used_capacity, capacity, max_capacity))
 
     @staticmethod
-    def _convert_weight_to_capacity(old_action_set: dict):
+    def convert_weight_to_capacity(old_action_set: dict):
         action_set = copy.deepcopy(old_action_set)
         for index, action in action_set.items():
             total_weight = sum(action.values())
@@ -0,0 +1,78 @@
+from typing import Optional
+
+import torch
+
+from optimizer.environment.actionparser import ActionParser
+from optimizer.environment.resetablecommunicator import ResetableCommunicator
+from optimizer.environment.rewardcalculator import RewardCalculator
+from optimizer.environment.yarn.schedulerstrategy import CapacitySchedulerStrategy
+from optimizer.environment.yarn.slstracereplayer import SlsTraceReplayer, read_sls_jobs
+from optimizer.environment.yarn.statetensorencoder import StateTensorEncoder
+from optimizer.environment.yarn.yarnmodel import State
+
+
+class SlsTraceReplayCommunicator(ResetableCommunicator):
+    """
+    Drop-in replacement of YarnSlsCommunicator which replays SLS jobs files
+    with SlsTraceReplayer instead of running SLS.
+    Every state read replays interval(ms) of time, so no sleep is needed between steps.
+    """
+
+    # RM start time(ms) replays are stamped with. It is fixed so that replays are
+    # reproducible, and has the magnitude of the timestamps seen on a real cluster.
+    EPOCH = 1562834622700
+
+    def __init__(self, interval: int, sls_jobs_dataset: str = '', num_nodes: int = 2):
+        self.interval = interval
+        self.num_nodes = num_nodes
+        self.current_dataset = sls_jobs_dataset
+
+        self.action_set = ActionParser.parse()
+        self.capacities = CapacitySchedulerStrategy.convert_weight_to_capacity(self.action_set)
+        self.action_index = 0
+
+        self.tensor_encoder = StateTensorEncoder()
+        self.reward_calculator = RewardCalculator()
+        self.replayer: Optional[SlsTraceReplayer] = None
+        self.state: Optional[State] = None
+
+    def set_dataset(self, filename: str):
+        self.current_dataset = filename
+
+    def override_config(self, action_index: int):
+        self.action_index = action_index
+        if self.replayer is not None:
+            self.replayer.set_capacities(self.capacities[action_index])
+
+    def reset(self) -> None:
+        self.close()
+        self.replayer = SlsTraceReplayer(read_sls_jobs(self.current_dataset), self.capacities[self.action_index],
+                                         CapacitySchedulerStrategy.MAXIMUM_CAPACITY, self.num_nodes,
+                                         epoch=self.EPOCH)
+
+    def close(self) -> None:
+        self.replayer = None
+        self.state = None
+        self.reward_calculator.reset()
+
+    def act(self, action_index: int) -> float:
+        self.override_config(action_index)
+        return self.get_reward()
+
+    def get_state(self) -> State:
+        self.replayer.advance(self.interval)
+        return self.replayer.get_state()
+
+    def get_state_tensor(self) -> torch.Tensor:
+        self.state = self.get_state()
+        return self.tensor_encoder.encode(self.state)
+
+    def get_reward(self) -> float:
+        return self.reward_calculator.get_reward(self.state)
+
+    def is_done(self) -> bool:
+        return self.replayer is None or self.replayer.is_done()
+
+    def get_total_time_cost(self):
+        time_costs = self.replayer.get_time_costs()
+        return time_costs, sum(time_costs)
@@ -0,0 +1,313 @@
+import dataclasses
+import heapq
+import json
+import logging
+from typing import Dict, List, Optional
+
+from optimizer.environment.yarn.yarnmodel import *
+
+
+@dataclasses.dataclass
+class SlsTask(object):
+    offset: int         # Start time relative to the first task of its job in trace(ms)
+    duration: int       # ms
+    priority: int
+
+
+@dataclasses.dataclass
+class SlsJob(object):
+    job_id: str
+    queue: str
+    submit_time: int    # ms
+    tasks: List[SlsTask]
+
+
+def read_sls_jobs(filename: str) -> List[SlsJob]:
+    """
+    Reads a SLS jobs file, which is a sequence of JSON objects rather than one JSON document.
+    """
+    with open(filename) as f:
+        text = f.read()
+
+    decoder, index, jobs = json.JSONDecoder(), 0, []
+    while True:
+        while index < len(text) and text[index].isspace():
+            index += 1
+        if index == len(text):
+            break
+        j, index = decoder.raw_decode(text, index)
+        jobs.append(_build_job(j))
+
+    return jobs
+
+
+def _build_job(j: dict) -> SlsJob:
+    tasks_json = sorted(j['job.tasks'], key=lambda t: t['container.start.ms'])
+    first_start = tasks_json[0]['container.start.ms'] if tasks_json else 0
+    tasks = [SlsTask(t['container.start.ms'] - first_start, t['container.end.ms'] - t['container.start.ms'],
+                     t['container.priority']) for t in tasks_json]
+    return SlsJob(j['job.id'], j['job.queue.name'], j['job.start.ms'], tasks)
+
+
+class _ReplayedApplication(object):
+    """Scheduling state of a job while it is being replayed."""
+
+    def __init__(self, index: int, job: SlsJob, application_id: str):
+        self.index = index
+        self.job = job
+        self.application_id = application_id
+        self.start_time: Optional[int] = None
+        self.finish_time: Optional[int] = None
+        self.ready_tasks: List[SlsTask] = []    # Tasks whose trace offset has elapsed, in launch order
+        self.next_task = 0                      # Index of the first task not ready yet
+        self.running_ends: List[int] = []       # Heap of end times of running task containers
+        self.finished_tasks = 0
+
+    @property
+    def is_waiting(self) -> bool:
+        return self.start_time is None
+
+    @property
+    def is_running(self) -> bool:
+        return self.start_time is not None and self.finish_time is None
+
+    @property
+    def containers(self) -> int:
+        """Containers held, AM included."""
+        return len(self.running_ends) + (1 if self.is_running else 0)
+
+    def has_demand(self) -> bool:
+        return self.is_waiting or (self.is_running and len(self.ready_tasks) > 0)
+
+
+class SlsTraceReplayer(object):
+    """
+    Replays a SLS jobs trace against a simplified capacity scheduler with a
+    discrete-event loop, so pre-training needs neither Hadoop nor wall-clock time.
+
+    The model:
+        Every container, AM included, takes CONTAINER_MEMORY_MB and CONTAINER_VCORES.
+        A job waits until its AM container is allocated, then each task becomes
+        ready once its trace offset has elapsed since then, and the AM is released
+        when the last task finishes.
+        Free containers go one by one to the queue with the lowest used / guaranteed
+        ratio whose usage is under its maximum capacity, and within a queue to
+        the earliest submitted job having demand.
+        Like maximum-am-resource-percent of YARN, AMs of a queue may hold
+        max_am_resource_percent of its guaranteed containers (one AM at least),
+        and AMs never hold the last free container, so running jobs always
+        get containers for their tasks.
+    If no event is left while jobs are unfinished the replay is stalled and
+    counts as done.
+    """
+
+    CONTAINER_MEMORY_MB = 1024
+    CONTAINER_VCORES = 1
+    # Defaults of yarn.sls.nm.memory.mb and yarn.sls.nm.vcores.
+    NODE_MEMORY_MB = 10240
+    NODE_VCORES = 10
+    AM_PRIORITY = 0
+    # Default of yarn.scheduler.capacity.maximum-am-resource-percent.
+    MAX_AM_RESOURCE_PERCENT = 0.1
+
+    # Kinds of events, finishing before readiness frees containers first.
+    _FINISH, _READY, _SUBMIT = range(3)
+
+    def __init__(self, jobs: List[SlsJob], capacities: Dict[str, float], max_capacity: float,
+                 num_nodes: int = 1, node_memory_mb: int = NODE_MEMORY_MB, node_vcores: int = NODE_VCORES,
+                 epoch: int = 0, max_am_resource_percent: float = MAX_AM_RESOURCE_PERCENT):
+        self.num_nodes = num_nodes
+        self.node_memory_mb = node_memory_mb
+        self.node_vcores = node_vcores
+        self.total_containers = num_nodes * min(node_memory_mb // self.CONTAINER_MEMORY_MB,
+                                                node_vcores // self.CONTAINER_VCORES)
+        self.max_am_resource_percent = max_am_resource_percent
+        # Time delays are predicted as timestamps, replayed time starts at epoch(ms).
+        self.epoch = epoch
+        self.now = 0
+
+        self.queue_names = list(capacities.keys())
+        self.capacities: Dict[str, float] = {}
+        self.max_capacity = max_capacity
+        self.set_capacities(capacities)
+
+        self.apps = [_ReplayedApplication(i, job, 'application_%d_%04d' % (epoch, i + 1))
+                     for i, job in enumerate(jobs)]
+        self.queue_apps: Dict[str, List[_ReplayedApplication]] = {name: [] for name in self.queue_names}
+        self.queue_used: Dict[str, int] = {name: 0 for name in self.queue_names}
+        self.queue_ams: Dict[str, int] = {name: 0 for name in self.queue_names}
+        self.used = 0
+        self.ams = 0
+        self.num_finished = 0
+
+        self._events = []
+        self._sequence = 0
+        self.logger = logging.getLogger(__name__)
+        for app in self.apps:
+            self._push(app.job.submit_time, self._SUBMIT, app)
+
+    def set_capacities(self, capacities: Dict[str, float]):
+        """Reconfigure queue capacities(%), taking effect from the next allocation."""
+        self.capacities = {name: capacities.get(name, 0) for name in self.queue_names}
+
+    def is_done(self) -> bool:
+        return self.num_finished == len(self.apps) or self.is_stalled()
+
+    def is_stalled(self) -> bool:
+        """Whether unfinished jobs are left with nothing to replay."""
+        return not self._events and self.num_finished < len(self.apps)
+
+    def advance(self, duration: int):
+        """Replay duration(ms) of time."""
+        end = self.now + duration
+        while self._events and self._events[0][0] <= end:
+            time = self._events[0][0]
+            while self._events and self._events[0][0] == time:
+                _, kind, _, app = heapq.heappop(self._events)
+                self._handle(time, kind, app)
+            self.now = time
+            self._schedule()
+        self.now = end
+        if self.is_stalled():
+            self.logger.warning('Replay stalled at %dms with %d of %d jobs finished.' %
+                                (self.now, self.num_finished, len(self.apps)))
+
+    def run(self):
+        """Replay until every job finishes."""
+        while not self.is_done():
+            self.advance(self._events[0][0] - self.now)
+
+    def get_state(self) -> State:
+        waiting_apps, running_apps = [], []
+        for app in self.apps:
+            if app.job.submit_time > self.now or app.finish_time is not None:
+                continue
+            if app.is_waiting:
+                waiting_apps.append(WaitingApplication(self.now - app.job.submit_time, 0, app.job.queue, [
+                    ApplicationRequestResource(self.AM_PRIORITY, self.CONTAINER_MEMORY_MB, self.CONTAINER_VCORES)
+                ]))
+            else:
+                running_apps.append(self._running_application(app))
+
+        memory = self.node_memory_mb // 1024
+        resources = [Resource(self.node_vcores, memory) for _ in range(self.num_nodes)]
+        constraints = [QueueConstraint(name, self._used_capacity(name), self.capacities[name], self.max_capacity)
+                       for name in self.queue_names]
+        return State(waiting_apps, running_apps, resources, constraints)
+
+    def get_time_costs(self) -> List[int]:
+        """Time(ms) from AM allocation to finish of every finished job, as jobruntime.csv of SLS."""
+        return [app.finish_time - app.start_time for app in self.apps if app.finish_time is not None]
+
+    def _running_application(self, app: _ReplayedApplication) -> RunningApplication:
+        total = len(app.job.tasks)
+        progress = 100.0 * app.finished_tasks / total if total else 0.0
+        guaranteed = self._guaranteed_containers(app.job.queue)
+        queue_usage_percentage = 100.0 * app.containers / guaranteed if guaranteed else 0.0
+        request_priorities = sorted({t.priority for t in app.ready_tasks})
+        request_resources = [ApplicationRequestResource(p, self.CONTAINER_MEMORY_MB, self.CONTAINER_VCORES)
+                             for p in request_priorities]
+        return RunningApplication(app.application_id, self.now - app.job.submit_time, 0, app.job.queue, progress,
+                                  queue_usage_percentage, self._predict_finish_time(app), request_resources)
+
+    def _predict_finish_time(self, app: _ReplayedApplication) -> int:
+        """
+        Finish timestamp of an app if it keeps its current task containers, the counterpart
+        of what SparkApplicationTimeDelayPredictor predicts on a real cluster.
+        """
+        remaining = sum(end - self.now for end in app.running_ends)
+        remaining += sum(t.duration for t in app.ready_tasks)
+        remaining += sum(t.duration for t in app.job.tasks[app.next_task:])
+        workers = max(len(app.running_ends), 1)
+        return self.epoch + self.now + remaining // workers
+
+    def _guaranteed_containers(self, queue_name: str) -> float:
+        return self.total_containers * self.capacities[queue_name] / 100
+
+    def _used_capacity(self, queue_name: str) -> float:
+        guaranteed = self._guaranteed_containers(queue_name)
+        return 100.0 * self.queue_used[queue_name] / guaranteed if guaranteed else 0.0
+
+    def _push(self, time: int, kind: int, app: _ReplayedApplication):
+        heapq.heappush(self._events, (time, kind, self._sequence, app))
+        self._sequence += 1
+
+    def _handle(self, time: int, kind: int, app: _ReplayedApplication):
+        if kind == self._SUBMIT:
+            self.queue_apps[app.job.queue].append(app)
+        elif kind == self._READY:
+            tasks = app.job.tasks
+            while app.next_task < len(tasks) and app.start_time + tasks[app.next_task].offset <= time:
+                app.ready_tasks.append(tasks[app.next_task])
+                app.next_task += 1
+            if app.next_task < len(tasks):
+                self._push(app.start_time + tasks[app.next_task].offset, self._READY, app)
+        elif kind == self._FINISH:
+            heapq.heappop(app.running_ends)
+            app.finished_tasks += 1
+            self._release(app)
+            if app.finished_tasks == len(app.job.tasks):
+                self._finish(app, time)
+
+    def _schedule(self):
+        while self.used < self.total_containers:
+            queue_name = self._pick_queue()
+            if queue_name is None:
+                return
+            app = next(a for a in self.queue_apps[queue_name] if self._can_allocate(a))
+            self._allocate(app)
+
+    def _pick_queue(self) -> Optional[str]:
+        best, best_ratio = None, None
+        for name in self.queue_names:
+            if self.queue_used[name] >= self.total_containers * self.max_capacity / 100:
+                continue
+            if not any(self._can_allocate(a) for a in self.queue_apps[name]):
+                continue
+            guaranteed = self._guaranteed_containers(name)
+            ratio = self.queue_used[name] / guaranteed if guaranteed else float('inf')
+            if best_ratio is None or ratio < best_ratio:
+                best, best_ratio = name, ratio
+        return best
+
+    def _can_allocate(self, app: _ReplayedApplication) -> bool:
+        if app.is_waiting:
+            queue_name = app.job.queue
+            return self.queue_ams[queue_name] < self._am_limit(queue_name) and \
+                self.ams < max(self.total_containers - 1, 1)
+        return app.has_demand()
+
+    def _am_limit(self, queue_name: str) -> int:
+        return max(1, int(self._guaranteed_containers(queue_name) * self.max_am_resource_percent))
+
+    def _allocate(self, app: _ReplayedApplication):
+        self.used += 1
+        self.queue_used[app.job.queue] += 1
+
+        if app.is_waiting:
+            app.start_time = self.now
+            self.ams += 1
+            self.queue_ams[app.job.queue] += 1
+            if app.job.tasks:
+                self._push(self.now + app.job.tasks[0].offset, self._READY, app)
+            else:
+                self._finish(app, self.now)
+            return
+
+        task = app.ready_tasks.pop(0)
+        end = self.now + task.duration
+        heapq.heappush(app.running_ends, end)
+        self._push(end, self._FINISH, app)
+
+    def _release(self, app: _ReplayedApplication):
+        self.used -= 1
+        self.queue_used[app.job.queue] -= 1
+
+    def _finish(self, app: _ReplayedApplication, time: int):
+        # Release the AM container.
+        self._release(app)
+        self.ams -= 1
+        self.queue_ams[app.job.queue] -= 1
+        app.finish_time = time
+        self.queue_apps[app.job.queue].remove(app)
+        self.num_finished += 1
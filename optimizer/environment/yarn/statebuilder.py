@@ -1,118 +1,81 @@
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 
 import requests
 import torch
 from requests.exceptions import ConnectionError
 
-from optimizer.hyperparameters import STATE_SHAPE
 from optimizer.environment.yarn.yarnmodel import *
+from optimizer.environment.yarn.statetensorencoder import StateTensorEncoder
 from optimizer.environment.spark.sparkapplicationtimedelaypredictor import SparkApplicationTimeDelayPredictor
-from optimizer.environment.spark.sparkapplicationbuilder import SparkApplicationBuilder
-from optimizer.environment.spark.completedsparkapplicationanalyzer import CompletedSparkApplicationAnalyzer
+from optimizer.environment.spark.predictionmodelstore import PredictionModelStore
 from optimizer.environment.stateinvalidexception import StateInvalidException
-from optimizer.util import jsonutil
+from optimizer.util.httpclient import HttpClient
 
 
 class StateBuilder(object):
 
-    def __init__(self, rm_api_url: str, spark_history_server_api_url: str, scheduler_strategy):
+    # Timeout in seconds of each RM endpoint polled by build().
+    TIMEOUTS = {
+        'waiting_apps': 5,
+        'running_apps': 10,
+        'nodes': 5,
+        'scheduler': 5,
+    }
+
+    # Fields of the RM apps endpoints read by build_*_apps_from_json, other fields are dropped while parsing.
+    WAITING_APP_FIELDS = ('elapsedTime', 'priority', 'queue', 'resourceRequests')
+    RUNNING_APP_FIELDS = ('id', 'name', 'progress', 'queueUsagePercentage') + WAITING_APP_FIELDS
+    APP_FIELDS = {
+        'waiting_apps': WAITING_APP_FIELDS,
+        'running_apps': RUNNING_APP_FIELDS,
+    }
+
+    def __init__(self, rm_api_url: str, spark_history_server_api_url: str, scheduler_strategy,
+                 http_client: Optional[HttpClient] = None):
         self.RM_API_URL = rm_api_url
         self.SPARK_HISTORY_SERVER_API_URL = spark_history_server_api_url
         self.scheduler_strategy = scheduler_strategy
+        self.http_client = http_client or HttpClient()
         self.application_time_delay_predictor = SparkApplicationTimeDelayPredictor(spark_history_server_api_url)
-        self._tmp_add_models()
-
-    # TODO: Replace this with train set.
-    def _tmp_add_models(self):
-        builder = SparkApplicationBuilder(self.SPARK_HISTORY_SERVER_API_URL)
-        analyzer = CompletedSparkApplicationAnalyzer()
-        predictor = self.application_time_delay_predictor
-
-        app = builder.build('application_1562834622700_0051')
-        svm_model = analyzer.analyze(app)
-        predictor.add_algorithm('linear', svm_model)
-
-        # ALS
-        app = builder.build('application_1562834622700_0039')
-        als_model = analyzer.analyze(app)
-        predictor.add_algorithm('als', als_model)
-
-        # KMeans
-        app = builder.build('application_1562834622700_0018')
-        svm_model = analyzer.analyze(app)
-        predictor.add_algorithm('kmeans', svm_model)
-
-        # SVM
-        app = builder.build('application_1562834622700_0014')
-        svm_model = analyzer.analyze(app)
-        predictor.add_algorithm('svm', svm_model)
-
-        # Bayes
-        app = builder.build('application_1562834622700_0043')
-        svm_model = analyzer.analyze(app)
-        predictor.add_algorithm('bayes', svm_model)
-
-        # FPGrowth
-        app = builder.build('application_1562834622700_0054')
-        svm_model = analyzer.analyze(app)
-        predictor.add_algorithm('fpgrowth', svm_model)
-
-        # LDA
-        app = builder.build('application_1562834622700_0058')
-        svm_model = analyzer.analyze(app)
-        predictor.add_algorithm('lda', svm_model)
+        self.tensor_encoder = StateTensorEncoder()
+        self._add_models()
+
+    def _add_models(self):
+        store = PredictionModelStore()
+        models = store.try_load()
+        if models is None:
+            # Build the store once, later environments will load it.
+            models = PredictionModelStore.crawl(self.SPARK_HISTORY_SERVER_API_URL)
+            store.save(models)
+
+        for algorithm_type, model in models.items():
+            self.application_time_delay_predictor.add_algorithm(algorithm_type, model)
 
     def build(self):
         try:
-            waiting_apps, running_apps = self.parse_and_build_applications()
-            resources = self.parse_and_build_resources()
-            constraints = self.parse_and_build_constraints()
+            responses = self.http_client.get_json_concurrently(self._get_endpoint_urls(), self.TIMEOUTS,
+                                                                self.APP_FIELDS)
+            waiting_apps = self.build_waiting_apps_from_json(responses['waiting_apps'])
+            running_apps = self.build_running_apps_from_json(responses['running_apps'])
+            resources = self.build_resources_from_json(responses['nodes'])
+            constraints = self.build_constraints_from_json(responses.get('scheduler'))
             return State(waiting_apps, running_apps, resources, constraints)
-        except (ConnectionError, TypeError, requests.exceptions.HTTPError):
+        except (ConnectionError, TypeError, requests.exceptions.HTTPError, requests.exceptions.Timeout):
             raise StateInvalidException
 
-    @staticmethod
-    def build_tensor(raw: State):
-        height, width = STATE_SHAPE
-        tensor = torch.zeros(height, width)
-
-        # Line 0-74: waiting apps and their resource requests
-        for i, wa in enumerate(raw.waiting_apps[:75]):
-            line = [wa.elapsed_time, wa.priority, wa.converted_location]
-            for rr in wa.request_resources[:64]:
-                line.extend([rr.priority, rr.memory, rr.cpu])
-            line.extend([0.0] * (width - len(line)))
-            tensor[i] = torch.Tensor(line)
-
-        # Line 75-149: running apps and their resource requests
-        for i, ra in enumerate(raw.running_apps[:75]):
-            row = i + 75
-            line = [ra.elapsed_time, ra.priority, ra.converted_location,
-                    ra.progress, ra.queue_usage_percentage, ra.predicted_time_delay]
-            for rr in ra.request_resources[:65]:
-                line.extend([rr.priority, rr.memory, rr.cpu])
-            line.extend([0.0] * (width - len(line)))
-            tensor[row] = torch.Tensor(line)
-
-        # Line 150-198: resources of cluster
-        row, idx = 150, 0
-        for r in raw.resources[:4900]:
-            tensor[row][idx] = r.mem
-            idx += 1
-            tensor[row][idx] = r.vcore_num
-            idx += 1
-            if idx == width:
-                row += 1
-                idx = 0
-
-        # Line 199: queue constraints
-        row, queue_constraints = 199, []
-        for c in raw.constraints[:50]:
-            queue_constraints.extend([c.converted_name, c.capacity, c.max_capacity, c.used_capacity])
-        queue_constraints.extend([0.0] * (width - len(queue_constraints)))
-        tensor[row] = torch.Tensor(queue_constraints)
-
-        return tensor
+    def _get_endpoint_urls(self) -> Dict[str, str]:
+        urls = {
+            'waiting_apps': self.RM_API_URL + 'ws/v1/cluster/apps?states=NEW,NEW_SAVING,SUBMITTED,ACCEPTED',
+            'running_apps': self.RM_API_URL + 'ws/v1/cluster/apps?states=RUNNING',
+            'nodes': self.RM_API_URL + 'ws/v1/cluster/nodes',
+        }
+        scheduler_url = self.scheduler_strategy.get_queue_constraints_url()
+        if scheduler_url is not None:
+            urls['scheduler'] = scheduler_url
+        return urls
+
+    def build_tensor(self, raw: State) -> torch.Tensor:
+        return self.tensor_encoder.encode(raw)
 
     def parse_and_build_applications(self) -> Tuple[List[WaitingApplication], List[RunningApplication]]:
         waiting_apps = self.parse_and_build_waiting_apps()
@@ -121,18 +84,22 @@ class StateBuilder(object):
 
     def parse_and_build_waiting_apps(self) -> List[WaitingApplication]:
         url = self.RM_API_URL + 'ws/v1/cluster/apps?states=NEW,NEW_SAVING,SUBMITTED,ACCEPTED'
-        app_json = jsonutil.get_json(url)
+        app_json = self.http_client.get_apps_json(url, self.WAITING_APP_FIELDS, self.TIMEOUTS['waiting_apps'])
         return self.build_waiting_apps_from_json(app_json)
 
     def parse_and_build_running_apps(self) -> List[RunningApplication]:
         url = self.RM_API_URL + 'ws/v1/cluster/apps?states=RUNNING'
-        app_json = jsonutil.get_json(url)
+        app_json = self.http_client.get_apps_json(url, self.RUNNING_APP_FIELDS, self.TIMEOUTS['running_apps'])
         return self.build_running_apps_from_json(app_json)
 
     def parse_and_build_resources(self) -> List[Resource]:
         url = self.RM_API_URL + 'ws/v1/cluster/nodes'
-        conf = jsonutil.get_json(url)
-        nodes = conf['nodes']['node']
+        conf = self.http_client.get_json(url, self.TIMEOUTS['nodes'])
+        return self.build_resources_from_json(conf)
+
+    @staticmethod
+    def build_resources_from_json(j: dict) -> List[Resource]:
+        nodes = j['nodes']['node']
         resources = []
         for n in nodes:
             memory = (int(n['usedMemoryMB']) + int(n['availMemoryMB'])) / 1024
@@ -143,6 +110,11 @@ class StateBuilder(object):
     def parse_and_build_constraints(self) -> List[QueueConstraint]:
         return self.scheduler_strategy.get_queue_constraints()
 
+    def build_constraints_from_json(self, j: Optional[dict]) -> List[QueueConstraint]:
+        if j is None:
+            return self.parse_and_build_constraints()
+        return self.scheduler_strategy.build_queue_constraints_from_json(j)
+
     def build_running_apps_from_json(self, j: dict) -> List[RunningApplication]:
         if j['apps'] is None:
             return []
@@ -187,10 +159,7 @@ class StateBuilder(object):
 
         resource_requests = j['resourceRequests']
         for req in resource_requests:
-            priority = req['priority']
             capability = req['capability']
-            memory = capability['memory']
-            cpu = capability['vCores']
-            ret.append(ApplicationRequestResource(priority, memory, cpu))
+            ret.append(ApplicationRequestResource(req['priority'], capability['memory'], capability['vCores']))
 
         return ret
@@ -0,0 +1,102 @@
+import itertools
+
+import numpy as np
+import torch
+
+from optimizer.hyperparameters import STATE_SHAPE
+from optimizer.environment.yarn.yarnmodel import *
+
+
+class StateTensorEncoder(object):
+    """
+    Packs a State into the STATE_SHAPE tensor consumed by DQN.
+
+    Layout:
+        Line 0-74:    waiting apps and their resource requests
+        Line 75-149:  running apps and their resource requests
+        Line 150-198: resources of cluster, (mem, vcore) pairs row by row
+        Line 199:     queue constraints
+    Every section is written with slice assignment into a preallocated
+    float32 buffer instead of one torch.Tensor per row.
+    """
+
+    WAITING_APP_ROWS = (0, 75)
+    RUNNING_APP_ROWS = (75, 150)
+    RESOURCE_ROWS = (150, 199)
+    CONSTRAINT_ROW = 199
+
+    WAITING_APP_HEADER_SIZE = 3
+    RUNNING_APP_HEADER_SIZE = 6
+
+    def __init__(self):
+        self.height, self.width = STATE_SHAPE
+        self._buffer = np.zeros(STATE_SHAPE, dtype=np.float32)
+
+        # Resource requests which fit in one row after the app header.
+        self.max_waiting_requests = min(64, (self.width - self.WAITING_APP_HEADER_SIZE) // 3)
+        self.max_running_requests = min(65, (self.width - self.RUNNING_APP_HEADER_SIZE) // 3)
+        self.max_resources = (self.RESOURCE_ROWS[1] - self.RESOURCE_ROWS[0]) * self.width // 2
+        self.max_constraints = self.width // 4
+
+    def encode(self, raw: State) -> torch.Tensor:
+        buffer = self._buffer
+        buffer.fill(0)
+
+        self._encode_waiting_apps(buffer, raw.waiting_apps)
+        self._encode_running_apps(buffer, raw.running_apps)
+        self._encode_resources(buffer, raw.resources)
+        self._encode_constraints(buffer, raw.constraints)
+
+        # The buffer is reused by the next call, hand out a private copy.
+        return torch.from_numpy(buffer.copy())
+
+    def _encode_waiting_apps(self, buffer: np.ndarray, waiting_apps: List[WaitingApplication]):
+        start, end = self.WAITING_APP_ROWS
+        apps = waiting_apps[:end - start]
+        if not apps:
+            return
+
+        buffer[start:start + len(apps), :self.WAITING_APP_HEADER_SIZE] = [
+            (wa.elapsed_time, wa.priority, wa.converted_location) for wa in apps
+        ]
+        self._encode_request_resources(buffer, start, self.WAITING_APP_HEADER_SIZE,
+                                       [wa.request_resources[:self.max_waiting_requests] for wa in apps])
+
+    def _encode_running_apps(self, buffer: np.ndarray, running_apps: List[RunningApplication]):
+        start, end = self.RUNNING_APP_ROWS
+        apps = running_apps[:end - start]
+        if not apps:
+            return
+
+        buffer[start:start + len(apps), :self.RUNNING_APP_HEADER_SIZE] = [
+            (ra.elapsed_time, ra.priority, ra.converted_location,
+             ra.progress, ra.queue_usage_percentage, ra.predicted_time_delay) for ra in apps
+        ]
+        self._encode_request_resources(buffer, start, self.RUNNING_APP_HEADER_SIZE,
+                                       [ra.request_resources[:self.max_running_requests] for ra in apps])
+
+    @staticmethod
+    def _encode_request_resources(buffer: np.ndarray, start_row: int, offset: int,
+                                  requests: List[List[ApplicationRequestResource]]):
+        for row, rrs in enumerate(requests, start_row):
+            if rrs:
+                # Requests are (priority, memory, cpu) tuples.
+                values = list(itertools.chain.from_iterable(rrs))
+                buffer[row, offset:offset + len(values)] = values
+
+    def _encode_resources(self, buffer: np.ndarray, resources: List[Resource]):
+        resources = resources[:self.max_resources]
+        if not resources:
+            return
+
+        start, end = self.RESOURCE_ROWS
+        flat = buffer[start:end].reshape(-1)
+        flat[:2 * len(resources)] = [v for r in resources for v in (r.mem, r.vcore_num)]
+
+    def _encode_constraints(self, buffer: np.ndarray, constraints: List[QueueConstraint]):
+        constraints = constraints[:self.max_constraints]
+        if not constraints:
+            return
+
+        values = [v for c in constraints for v in (c.converted_name, c.capacity, c.max_capacity, c.used_capacity)]
+        buffer[self.CONSTRAINT_ROW, :len(values)] = values
@@ -3,8 +3,9 @@ from optimizer.environment.abstractcommunicator import AbstractCommunicator
 
 class YarnCommunicator(AbstractCommunicator):
 
-    def __init__(self, rm_host: str, spark_history_server_host: str, hadoop_home: str):
-        super().__init__(rm_host, spark_history_server_host, hadoop_home)
+    def __init__(self, rm_host: str, spark_history_server_host: str, hadoop_home: str,
+                 scheduler_conf_api: bool = False):
+        super().__init__(rm_host, spark_history_server_host, hadoop_home, scheduler_conf_api)
 
     def is_done(self) -> bool:
         return False
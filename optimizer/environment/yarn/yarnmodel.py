@@ -1,11 +1,12 @@
-from typing import List
+from typing import List, NamedTuple
 import dataclasses
 
-from optimizer.hyperparameters import QUEUES
+from optimizer.environment.yarn.queueregistry import QUEUE_REGISTRY
 
 
-@dataclasses.dataclass
-class ApplicationRequestResource(object):
+# Model classes are allocated per app and per resource request on every poll,
+# so they declare __slots__, and request resources are plain tuples.
+class ApplicationRequestResource(NamedTuple):
     priority: int
     memory: int
     cpu: int
@@ -14,11 +15,12 @@ class ApplicationRequestResource(object):
 # TODO: We may need more information to calculate its predicted time delay.
 @dataclasses.dataclass
 class WaitingApplication(object):
+    __slots__ = ('elapsed_time', 'priority', 'location', 'request_resources')
 
     elapsed_time: int
     priority: int
     location: str
-    request_resources: List[ApplicationRequestResource] = dataclasses.field(default_factory=list)
+    request_resources: List[ApplicationRequestResource]
 
     @property
     def converted_location(self):
@@ -27,6 +29,8 @@ class WaitingApplication(object):
 
 @dataclasses.dataclass
 class RunningApplication(object):
+    __slots__ = ('application_id', 'elapsed_time', 'priority', 'location', 'progress', 'queue_usage_percentage',
+                 'predicted_time_delay', 'request_resources')
 
     application_id: str
     elapsed_time: int
@@ -35,7 +39,7 @@ class RunningApplication(object):
     progress: float
     queue_usage_percentage: float
     predicted_time_delay: int
-    request_resources: List[ApplicationRequestResource] = dataclasses.field(default_factory=list)
+    request_resources: List[ApplicationRequestResource]
 
     @property
     def converted_location(self):
@@ -44,17 +48,22 @@ class RunningApplication(object):
 
 @dataclasses.dataclass
 class FinishedApplication(object):
+    __slots__ = ('elapsed_time', )
+
     elapsed_time: int
 
 
 @dataclasses.dataclass
 class Resource(object):
+    __slots__ = ('vcore_num', 'mem')
+
     vcore_num: int      # vCore
     mem: int            # Memory(GB)
 
 
 @dataclasses.dataclass
 class QueueConstraint(object):
+    __slots__ = ('name', 'used_capacity', 'capacity', 'max_capacity')
 
     name: str
     used_capacity: float
@@ -75,4 +84,4 @@ class State(object):
 
 
 def queue_name_to_index(queue_name: str) -> int:
-    return QUEUES['names'].index(queue_name)
+    return QUEUE_REGISTRY.index(queue_name)
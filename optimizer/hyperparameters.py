@@ -7,6 +7,9 @@ TRAIN_LOOP_INTERNAL = 1
 TEST_LOOP_INTERNAL = 5
 EVALUATION_LOOP_INTERNAL = 10
 
+# Seconds without a new action before a queue reconfiguration is applied
+RECONFIGURATION_DEBOUNCE = 0.2
+
 QUEUES = {
     "names": ["queueA", "queueB", "queueC", "queueD"],
     "actions": {
@@ -22,3 +25,14 @@ QUEUES = {
         9: [3, 1, 1, 1]
     }
 }
+
+# Completed applications whose prediction models represent each algorithm.
+PREDICTION_MODEL_PROTOTYPES = {
+    "linear": "application_1562834622700_0051",
+    "als": "application_1562834622700_0039",
+    "kmeans": "application_1562834622700_0018",
+    "svm": "application_1562834622700_0014",
+    "bayes": "application_1562834622700_0043",
+    "fpgrowth": "application_1562834622700_0054",
+    "lda": "application_1562834622700_0058"
+}
@@ -1 +1,7 @@
 from optimizer.nn.dqn import DQN
+from optimizer.nn.entitydqn import EntityDQN
+from optimizer.nn.frozenpolicy import FrozenPolicy
+from optimizer.nn.targetsync import soft_update
+
+# Networks selectable by --architecture
+ARCHITECTURES = {'canonical': DQN, 'entity': EntityDQN}
@@ -0,0 +1,92 @@
+import torch
+from torch import nn
+from torch.nn import functional as F
+
+from optimizer.environment.yarn.statetensorencoder import StateTensorEncoder
+from optimizer.nn.noisylinear import NoisyLinear
+
+
+class EntitySetEncoder(nn.Module):
+    """
+    Embeds every entity (a feature vector) with a shared MLP and pools the set
+    into a fixed size vector by masked mean and max. All-zero entities are padding.
+    """
+
+    def __init__(self, in_features: int, embedding_size: int):
+        super().__init__()
+        self.mlp = nn.Sequential(nn.Linear(in_features, embedding_size), nn.ReLU(),
+                                 nn.Linear(embedding_size, embedding_size), nn.ReLU())
+
+    def forward(self, entities: torch.Tensor) -> torch.Tensor:
+        mask = (entities != 0).any(-1, keepdim=True).to(entities.dtype)
+        # Raw values range from flags to megabytes and milliseconds.
+        h = self.mlp(entities.sign() * entities.abs().log1p()) * mask
+        mean = h.sum(-2) / mask.sum(-2).clamp(min=1)
+        # Embeddings are non-negative after ReLU, so padding never wins the max.
+        return torch.cat([mean, h.max(-2)[0]], -1)
+
+
+class EntityDQN(nn.Module):
+    """
+    DQN reading the state grid as sets of entities instead of convolving it.
+
+    The rows StateTensorEncoder writes are cut into waiting apps, running apps,
+    (mem, vcore) node pairs and queue constraints. Apps keep their header and
+    first REQUESTS_PER_APP resource requests, the rest of a row is almost
+    always padding. Every section is pooled by its own EntitySetEncoder and the
+    frames of the history are concatenated before the dueling noisy head.
+    """
+
+    REQUESTS_PER_APP = 8
+
+    def __init__(self, args, action_space):
+        super().__init__()
+        self.atoms = args.atoms
+        self.action_space = action_space
+
+        self.waiting_app_features = StateTensorEncoder.WAITING_APP_HEADER_SIZE + 3 * self.REQUESTS_PER_APP
+        self.running_app_features = StateTensorEncoder.RUNNING_APP_HEADER_SIZE + 3 * self.REQUESTS_PER_APP
+        embedding_size = args.entity_embedding_size
+        self.waiting_apps = EntitySetEncoder(self.waiting_app_features, embedding_size)
+        self.running_apps = EntitySetEncoder(self.running_app_features, embedding_size)
+        self.resources = EntitySetEncoder(2, embedding_size)
+        self.constraints = EntitySetEncoder(4, embedding_size)
+        self.encoder_output_size = args.history_length * 4 * 2 * embedding_size
+
+        self.fc_h_v = NoisyLinear(self.encoder_output_size, args.hidden_size, std_init=args.noisy_std)
+        self.fc_h_a = NoisyLinear(self.encoder_output_size, args.hidden_size, std_init=args.noisy_std)
+        self.fc_z_v = NoisyLinear(args.hidden_size, self.atoms, std_init=args.noisy_std)
+        self.fc_z_a = NoisyLinear(args.hidden_size, action_space * self.atoms, std_init=args.noisy_std)
+
+    def encode(self, x: torch.Tensor) -> torch.Tensor:
+        batch_size = x.size(0)
+        waiting_start, waiting_end = StateTensorEncoder.WAITING_APP_ROWS
+        running_start, running_end = StateTensorEncoder.RUNNING_APP_ROWS
+        resource_start, resource_end = StateTensorEncoder.RESOURCE_ROWS
+        constraint_row = StateTensorEncoder.CONSTRAINT_ROW
+
+        waiting_apps = x[:, :, waiting_start:waiting_end, :self.waiting_app_features]
+        running_apps = x[:, :, running_start:running_end, :self.running_app_features]
+        resources = x[:, :, resource_start:resource_end].reshape(batch_size, x.size(1), -1, 2)
+        constraints = x[:, :, constraint_row].reshape(batch_size, x.size(1), -1, 4)
+
+        features = torch.cat([self.waiting_apps(waiting_apps), self.running_apps(running_apps),
+                              self.resources(resources), self.constraints(constraints)], -1)
+        return features.view(batch_size, self.encoder_output_size)
+
+    def forward(self, x, log=False) -> torch.Tensor:
+        x = self.encode(x)
+        v = self.fc_z_v(F.relu(self.fc_h_v(x)))  # Value stream
+        a = self.fc_z_a(F.relu(self.fc_h_a(x)))  # Advantage stream
+        v, a = v.view(-1, 1, self.atoms), a.view(-1, self.action_space, self.atoms)
+        q = v + a - a.mean(1, keepdim=True)  # Combine streams
+        if log:  # Use log softmax for numerical stability
+            q = F.log_softmax(q, dim=2)  # Log probabilities with action over second dimension
+        else:
+            q = F.softmax(q, dim=2)  # Probabilities with action over second dimension
+        return q
+
+    def reset_noise(self):
+        for name, module in self.named_children():
+            if 'fc' in name:
+                module.reset_noise()
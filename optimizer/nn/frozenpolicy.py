@@ -0,0 +1,71 @@
+import copy
+import time
+from collections import deque
+from typing import Dict, Iterable
+
+import numpy as np
+import torch
+from torch import nn
+
+from optimizer.nn.noisylinear import NoisyLinear
+
+
+class FrozenPolicy(object):
+    """
+    CPU inference copy of a DQN for acting only.
+
+    Noisy layers are replaced by plain linear layers holding their μ weights,
+    as in evaluation mode, and the distributional head is reduced to expected
+    Q-values before the network is traced with TorchScript. Linear layers can
+    be dynamically quantized to int8 beforehand. Latencies of the last
+    LATENCY_WINDOW act() calls are kept for reporting.
+    """
+
+    LATENCY_WINDOW = 1000
+
+    def __init__(self, net: nn.Module, support: torch.Tensor, example_state: torch.Tensor, quantize: bool = False):
+        module = ExpectedQ(self._without_noise(copy.deepcopy(net).cpu()), support.cpu()).eval()
+        if quantize:
+            module = torch.quantization.quantize_dynamic(module, {nn.Linear}, dtype=torch.qint8)
+        with torch.no_grad():
+            self.module = torch.jit.trace(module, example_state.unsqueeze(0).cpu())
+        self.latencies = deque([], maxlen=self.LATENCY_WINDOW)
+
+    # Acts based on single state (no batch)
+    def act(self, state: torch.Tensor) -> int:
+        start = time.perf_counter()
+        with torch.no_grad():
+            action = self.module(state.unsqueeze(0).cpu()).argmax(1).item()
+        self.latencies.append(time.perf_counter() - start)
+        return action
+
+    def latency_percentiles(self, percentiles: Iterable[int] = (50, 90, 99)) -> Dict[int, float]:
+        """:return: act() latency in ms of each percentile."""
+        if not self.latencies:
+            return {}
+        latencies = np.array(self.latencies) * 1000
+        return {p: float(np.percentile(latencies, p)) for p in percentiles}
+
+    @classmethod
+    def _without_noise(cls, module: nn.Module) -> nn.Module:
+        for name, child in module.named_children():
+            if isinstance(child, NoisyLinear):
+                linear = nn.Linear(child.in_features, child.out_features)
+                linear.weight.data.copy_(child.weight_mu.data)
+                linear.bias.data.copy_(child.bias_mu.data)
+                setattr(module, name, linear)
+            else:
+                cls._without_noise(child)
+        return module
+
+
+class ExpectedQ(nn.Module):
+    """Reduces the value distributions of a DQN to expected Q-values."""
+
+    def __init__(self, net: nn.Module, support: torch.Tensor):
+        super().__init__()
+        self.net = net
+        self.register_buffer('support', support)
+
+    def forward(self, x) -> torch.Tensor:
+        return (self.net(x) * self.support).sum(2)
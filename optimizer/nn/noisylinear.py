@@ -7,6 +7,12 @@ from torch.nn import functional as F
 
 # Factorised NoisyLinear layer with bias
 class NoisyLinear(nn.Module):
+    """
+    Keeps only the factorised noise vectors ε_in and ε_out (bias_epsilon),
+    never the dense out×in ε_out ε_inᵀ matrix. In training mode
+        (μ_w + σ_w ⊙ ε_out ε_inᵀ) x = μ_w x + ε_out ⊙ σ_w (ε_in ⊙ x)
+    so the noisy output costs two matrix products and no weight-sized temporaries.
+    """
 
     def __init__(self, in_features, out_features, std_init=0.4):
         super(NoisyLinear, self).__init__()
@@ -15,7 +21,7 @@ class NoisyLinear(nn.Module):
         self.std_init = std_init
         self.weight_mu = nn.Parameter(torch.empty(out_features, in_features))
         self.weight_sigma = nn.Parameter(torch.empty(out_features, in_features))
-        self.register_buffer('weight_epsilon', torch.empty(out_features, in_features))
+        self.register_buffer('epsilon_in', torch.empty(in_features))
         self.bias_mu = nn.Parameter(torch.empty(out_features))
         self.bias_sigma = nn.Parameter(torch.empty(out_features))
         self.register_buffer('bias_epsilon', torch.empty(out_features))
@@ -35,14 +41,24 @@ class NoisyLinear(nn.Module):
         return x.sign().mul_(x.abs().sqrt_())
 
     def reset_noise(self):
-        epsilon_in = self._scale_noise(self.in_features)
-        epsilon_out = self._scale_noise(self.out_features)
-        self.weight_epsilon.copy_(epsilon_out.ger(epsilon_in))
-        self.bias_epsilon.copy_(epsilon_out)
+        self.epsilon_in.copy_(self._scale_noise(self.in_features))
+        self.bias_epsilon.copy_(self._scale_noise(self.out_features))
+
+    @property
+    def weight_epsilon(self) -> torch.Tensor:
+        """The dense noise matrix, built on demand only."""
+        return self.bias_epsilon.ger(self.epsilon_in)
 
     def forward(self, input) -> torch.Tensor:
         if self.training:
-            return F.linear(input, self.weight_mu + self.weight_sigma * self.weight_epsilon,
-                            self.bias_mu + self.bias_sigma * self.bias_epsilon)
+            output = F.linear(input, self.weight_mu, self.bias_mu + self.bias_sigma * self.bias_epsilon)
+            return output + F.linear(input * self.epsilon_in, self.weight_sigma) * self.bias_epsilon
         else:
             return F.linear(input, self.weight_mu, self.bias_mu)
+
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        # Models saved before the noise was factorised carry the dense matrix instead of ε_in,
+        # noise is resampled before it matters, so keep the current ε_in.
+        if state_dict.pop(prefix + 'weight_epsilon', None) is not None:
+            state_dict.setdefault(prefix + 'epsilon_in', self.epsilon_in.clone())
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
@@ -0,0 +1,22 @@
+import torch
+from torch import nn
+
+
+def soft_update(target: nn.Module, online: nn.Module, tau: float) -> None:
+    """
+    Moves target parameters towards online ones in place, θtarget ← τθonline + (1 - τ)θtarget.
+    Noise buffers of NoisyLinear are skipped, target noise is resampled before every use.
+    """
+    with torch.no_grad():
+        for target_param, online_param in zip(target.parameters(), online.parameters()):
+            if tau == 1:
+                target_param.copy_(online_param)
+            else:
+                target_param.lerp_(online_param, tau)
+        for (name, target_buffer), online_buffer in zip(target.named_buffers(), online.buffers()):
+            if not _is_noise(name):
+                target_buffer.copy_(online_buffer)
+
+
+def _is_noise(buffer_name: str) -> bool:
+    return buffer_name.endswith('epsilon') or buffer_name.endswith('epsilon_in')
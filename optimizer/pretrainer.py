@@ -1,9 +1,13 @@
 import logging
 import time
+from typing import List, Tuple
+
+import torch
 
 from optimizer.agent import Agent
 from optimizer.environment import PreTrainEnv, StateInvalidException
 from optimizer.hyperparameters import PRE_TRAIN_LOOP_INTERNAL
+from optimizer.pretrainworkerpool import PreTrainWorkerPool
 from optimizer.replaymemory import ReplayMemoryProxy
 from optimizer.replaymemory.memoryserializer import MemorySerializer
 from optimizer.util import fileutil
@@ -26,10 +30,7 @@ class PreTrainer(object):
         # Try to load data from file, if fails run training set and
         # save them into memory.
         if not self.memory_serializer.try_load():
-            for action_index, file_index in self._train_range():
-                self.train_once(action_index, file_index)
-                self.memory_serializer.save(action_index, file_index)
-                self._mark(action_index, file_index)
+            self._train_settings(list(self._train_range()))
 
             # Save data
             self.memory_serializer.save()
@@ -50,17 +51,48 @@ class PreTrainer(object):
                 train_settings = [(action_index, file_index) for action_index, file_index in self._train_range()]
                 start_index = train_settings.index((last_action_index, last_file_index))
 
-                for action_index, file_index in train_settings[start_index + 1:]:
-                    self.train_once(action_index, file_index)
-                    self.memory_serializer.save(action_index, file_index)
-                    self._mark(action_index, file_index)
-
+                self._train_settings(train_settings[start_index + 1:])
                 self.memory_serializer.save()
 
         # Pre-train DQN model by using training set
         self.dqn.learn(self.mem)
         self.logger.info('Pre-training DQN model finished.')
 
+    def _train_settings(self, settings: List[Tuple[int, int]]):
+        """
+        Run an episode for every (action index, file index) and save memory after each,
+        so a breakpoint can resume from the last one saved.
+        """
+        num_workers = self.args.pre_train_workers
+        if num_workers > 1 and not self.args.offline_pre_train:
+            # Parallel SLS runs would share the ports and working directory of one Hadoop.
+            self.logger.warning('Pre-training with workers needs --offline-pre-train, using one.')
+            num_workers = 1
+
+        if num_workers <= 1:
+            for action_index, file_index in settings:
+                self.train_once(action_index, file_index)
+                self._save_episode(action_index, file_index)
+            return
+
+        T = 0
+        pool = PreTrainWorkerPool(self.args, num_workers)
+        for kind, action_index, file_index, payload in pool.episodes(settings):
+            if kind == 'transition':
+                frame, reward, done = payload
+                self.mem.append(torch.from_numpy(frame).unsqueeze(0), action_index, reward, done)
+                T += 1
+            elif kind == 'invalid':
+                self.mem.terminate()
+            elif kind == 'end':
+                self.logger.info('Iterations: %d, Action: %d, File: %d' % (T, action_index, file_index))
+                self._save_episode(action_index, file_index)
+                T = 0
+
+    def _save_episode(self, action_index: int, file_index: int):
+        self.memory_serializer.save(action_index, file_index)
+        self._mark(action_index, file_index)
+
     def train_once(self, action_index: int, file_index: int):
         train_env = PreTrainEnv(self.args)
         train_env.start_sls(file_index, action_index)
@@ -71,7 +103,9 @@ class PreTrainer(object):
                 state, reward, done = train_env.step()
                 print('Iteration: %d, Action: %d, File: %d, Reward: %f' % (T, action_index, file_index, reward))
                 self.mem.append(state, action_index, reward, done)
-                time.sleep(PRE_TRAIN_LOOP_INTERNAL)
+                # Replayed traces advance their own clock.
+                if not self.args.offline_pre_train:
+                    time.sleep(PRE_TRAIN_LOOP_INTERNAL)
                 T += 1
             except StateInvalidException:
                 self.mem.terminate()
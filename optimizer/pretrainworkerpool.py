@@ -0,0 +1,149 @@
+import argparse
+import multiprocessing
+import multiprocessing.pool
+import os
+import time
+import traceback
+from queue import Empty
+from typing import Dict, Iterator, List, Tuple
+
+import torch
+
+from optimizer.environment import PreTrainEnv, StateInvalidException
+
+
+class PreTrainWorkerPool(object):
+    """
+    Runs pre-training episodes, one per (action index, file index), on a process pool.
+
+    Each worker owns its environment and streams transitions back in chunks
+    through a queue. episodes() yields them strictly in the order of the given
+    settings: transitions of the earliest unfinished episode pass through as
+    they arrive, those of later episodes are held until it ends. At most
+    max_pending episodes are dispatched ahead of the earliest unfinished one,
+    which bounds how much is held.
+
+    A worker which dies, or no message from any worker for timeout seconds,
+    fails episodes() instead of leaving it waiting forever.
+    """
+
+    CHUNK_SIZE = 16
+    # Seconds between checks of the workers while nothing arrives.
+    POLL_INTERVAL = 1.0
+
+    def __init__(self, args: argparse.Namespace, num_workers: int, max_pending: int = 0, timeout: float = 600):
+        self.args = argparse.Namespace(**vars(args))
+        # Workers replay on CPU, the parent moves frames into memory anyway.
+        self.args.device = torch.device('cpu')
+        self.num_workers = num_workers
+        self.max_pending = max_pending or 2 * num_workers
+        self.timeout = timeout
+
+    def episodes(self, settings: List[Tuple[int, int]]) -> Iterator[Tuple[str, int, int, tuple]]:
+        """
+        Yields (kind, action index, file index, payload) in episode order, kind being
+            'transition': payload is (frame, reward, done),
+            'invalid':    the episode ends with StateInvalidException, payload is (),
+            'end':        the episode is finished, payload is ().
+        """
+        ctx = multiprocessing.get_context('spawn')
+        queue = ctx.Queue()
+        # Process id of the worker running each episode, 0 before it starts. Written to shared
+        # memory rather than sent through the queue, which loses what a killed worker has not flushed.
+        pids = ctx.Array('i', len(settings), lock=False)
+        with ctx.Pool(self.num_workers, initializer=_init_worker, initargs=(queue, pids)) as pool:
+            results: Dict[int, multiprocessing.pool.AsyncResult] = {}
+            finished = set()
+            held: Dict[int, list] = {}
+            next_episode = 0
+            last_message = time.time()
+            while next_episode < len(settings):
+                while len(results) < min(len(settings), next_episode + self.max_pending):
+                    episode = len(results)
+                    action_index, file_index = settings[episode]
+                    results[episode] = pool.apply_async(_run_episode, (self.args, episode, action_index, file_index))
+
+                try:
+                    kind, episode, payload = queue.get(timeout=self.POLL_INTERVAL)
+                except Empty:
+                    self._check_workers(settings, results, pids, finished)
+                    if time.time() - last_message > self.timeout:
+                        raise RuntimeError('No pre-training worker has sent anything for %ds.' % self.timeout)
+                    continue
+
+                last_message = time.time()
+                if kind == 'error':
+                    raise RuntimeError('Pre-training episode %s failed:\n%s' % (settings[episode], payload))
+                if kind == 'end':
+                    finished.add(episode)
+                held.setdefault(episode, []).append((kind, payload))
+
+                # Release what the leading episode has sent, moving on whenever it ends.
+                while next_episode in held:
+                    action_index, file_index = settings[next_episode]
+                    ended = False
+                    for kind, payload in held.pop(next_episode):
+                        for event_kind, event_payload in _expand(kind, payload):
+                            yield event_kind, action_index, file_index, event_payload
+                        ended = kind == 'end'
+                    if not ended:
+                        break
+                    next_episode += 1
+
+    @staticmethod
+    def _check_workers(settings: List[Tuple[int, int]], results: Dict[int, multiprocessing.pool.AsyncResult],
+                       pids, finished: set):
+        """Raises if a task failed outside _run_episode or the worker of an unfinished episode is gone."""
+        for result in results.values():
+            if result.ready() and not result.successful():
+                result.get()
+        # The pool replaces a killed worker, but the episode it ran is lost.
+        alive = {process.pid for process in multiprocessing.active_children()}
+        for episode in results:
+            if episode not in finished and pids[episode] != 0 and pids[episode] not in alive:
+                raise RuntimeError('Worker of pre-training episode %s died.' % (settings[episode], ))
+
+
+def _expand(kind: str, payload):
+    if kind == 'transitions':
+        for transition in payload:
+            yield 'transition', transition
+    else:
+        yield kind, ()
+
+
+_queue = None
+_pids = None
+
+
+def _init_worker(queue, pids):
+    global _queue, _pids
+    _queue, _pids = queue, pids
+    # One process per core already, avoid oversubscribing them with intra-op threads.
+    torch.set_num_threads(1)
+
+
+def _run_episode(args: argparse.Namespace, episode: int, action_index: int, file_index: int):
+    try:
+        _pids[episode] = os.getpid()
+        train_env = PreTrainEnv(args)
+        train_env.start_sls(file_index, action_index)
+
+        chunk, done = [], False
+        while not done:
+            try:
+                state, reward, done = train_env.step()
+                chunk.append((state[-1].numpy(), reward, done))
+            except StateInvalidException:
+                _queue.put(('transitions', episode, chunk))
+                _queue.put(('invalid', episode, None))
+                chunk, done = [], True
+
+            if len(chunk) >= PreTrainWorkerPool.CHUNK_SIZE or (done and chunk):
+                _queue.put(('transitions', episode, chunk))
+                chunk = []
+
+        train_env.communicator.close()
+        _queue.put(('end', episode, None))
+    except Exception:
+        _queue.put(('error', episode, traceback.format_exc()))
@@ -1,2 +1,4 @@
 from optimizer.replaymemory.memoryproxy import ReplayMemoryProxy
 from optimizer.replaymemory.memoryserializer import MemorySerializer
+from optimizer.replaymemory.synchronizedmemoryproxy import SynchronizedMemoryProxy
+from optimizer.replaymemory.batchprefetcher import BatchPrefetcher
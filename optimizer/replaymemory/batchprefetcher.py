@@ -0,0 +1,113 @@
+import queue
+import threading
+
+import numpy as np
+import torch
+
+from optimizer.hyperparameters import STATE_SHAPE
+from optimizer.replaymemory.memoryproxy import ReplayMemoryProxy
+from optimizer.replaymemory.synchronizedmemoryproxy import SynchronizedMemoryProxy
+
+
+class BatchPrefetcher(SynchronizedMemoryProxy):
+    """
+    Replay memory whose sample() hands out batches drawn ahead of time.
+
+    A background thread keeps num_batches batches sampled. Every batch is
+    packed into one flat host buffer, pinned when learning on CUDA, and moved
+    to the device with a single copy. Pinned buffers are reused once their
+    copy has completed.
+
+    A batch may be sampled before transitions are appended over some of its
+    slots. update_priorities() drops the priorities of those slots, so new
+    transitions keep the maximum priority they were stored with.
+
+    If sampling fails, the background thread stops and every later sample()
+    raises its error.
+    """
+
+    def __init__(self, proxy: ReplayMemoryProxy, args, num_batches: int):
+        super().__init__(proxy)
+        self.mem = proxy.memory
+        self.device = args.device
+        self.batch_size = args.batch_size
+        self.pinned = self.device.type == 'cuda'
+
+        self._batches = queue.Queue(maxsize=num_batches)
+        # A buffer per queued batch, one being filled and one being copied.
+        self._free_buffers = queue.Queue()
+        for _ in range(num_batches + 2 if self.pinned else 0):
+            self._free_buffers.put((self._new_buffer(), None))
+        self._thread = None
+        self._stamp = None
+        self._error = None
+
+    def sample(self, batch_size):
+        if batch_size != self.batch_size:
+            return super().sample(batch_size)
+        if self._error is not None:
+            raise self._error
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._prefetch, daemon=True)
+            self._thread.start()
+
+        buffer, tree_idxs, stamp = self._batches.get()
+        if isinstance(buffer, Exception):
+            self._error = buffer
+            raise buffer
+        self._stamp = stamp
+        batch = self._unpack(tree_idxs, buffer.to(device=self.device, non_blocking=True))
+        if self.pinned:
+            copied = torch.cuda.Event()
+            copied.record()
+            self._free_buffers.put((buffer, copied))
+        return batch
+
+    def update_priorities(self, idxs, priorities):
+        """Updates priorities of the batch handed out last, skipping slots overwritten since it was sampled."""
+        with self._lock:
+            index, appended = self._stamp
+            overwritten = self.mem.transitions.appended - appended
+            if overwritten > 0:
+                data_idxs = idxs - self.mem.capacity + 1
+                kept = (data_idxs - index) % self.mem.capacity >= overwritten
+                idxs, priorities = idxs[kept], priorities[torch.from_numpy(kept).to(priorities.device)]
+            return self._proxy.update_priorities(idxs, priorities)
+
+    def _prefetch(self):
+        while True:
+            try:
+                if self.pinned:
+                    buffer, copied = self._free_buffers.get()
+                    if copied is not None:
+                        copied.synchronize()
+                else:
+                    buffer = self._new_buffer()
+                with self._lock:
+                    stamp = (self.mem.transitions.index, self.mem.transitions.appended)
+                    tree_idxs, *arrays = self.mem.sample_arrays(self.batch_size)
+                self._pack(buffer, arrays)
+                self._batches.put((buffer, tree_idxs, stamp))
+            except Exception as e:
+                self._batches.put((e, None, None))
+                return
+
+    def _layout(self):
+        frames_size = self.batch_size * (self.mem.history + self.mem.n) * int(np.prod(STATE_SHAPE))
+        # frames, actions, returns, nonterminals, weights
+        return [frames_size] + [self.batch_size] * 4
+
+    def _new_buffer(self) -> torch.Tensor:
+        buffer = torch.empty(sum(self._layout()), dtype=torch.float32)
+        return buffer.pin_memory() if self.pinned else buffer
+
+    def _pack(self, buffer: torch.Tensor, arrays):
+        for part, value in zip(torch.split(buffer, self._layout()), arrays):
+            # Actions are small integers, exact in float32.
+            part.copy_(torch.from_numpy(np.ascontiguousarray(value, dtype=np.float32).reshape(-1)))
+
+    def _unpack(self, tree_idxs: np.ndarray, buffer: torch.Tensor):
+        frames, actions, returns, nonterminals, weights = torch.split(buffer, self._layout())
+        frames = frames.view(self.batch_size, self.mem.history + self.mem.n, *STATE_SHAPE)
+        states, next_states = self.mem.split_frames(frames)
+        return tree_idxs, states, actions.long(), returns, next_states, nonterminals.view(-1, 1), weights
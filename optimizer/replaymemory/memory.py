@@ -1,9 +1,10 @@
-import random
-
+import numpy as np
 import torch
 
+from optimizer.hyperparameters import STATE_SHAPE
 from optimizer.replaymemory.segmenttree import SegmentTree
 from optimizer.replaymemory.transition import Transition, blank_trans
+from optimizer.replaymemory.transitionstore import TransitionStore
 
 
 class ReplayMemory(object):
@@ -13,14 +14,16 @@ class ReplayMemory(object):
         self.capacity = capacity
         self.history = args.history_length
         self.discount = args.discount
+        self.state_dtype = args.memory_state_dtype
         self.n = args.multi_step
         # Initial importance sampling weight β, annealed to 1 over course of training
         self.priority_weight = args.priority_weight
         self.priority_exponent = args.priority_exponent
+        self.global_weight_normalisation = args.global_weight_normalisation
         # Internal episode timestep counter
         self.t = 0
         # Store transitions in a wrap-around cyclic buffer within a sum tree for querying priorities
-        self.transitions = SegmentTree(capacity)
+        self.transitions = SegmentTree(capacity, TransitionStore(capacity, STATE_SHAPE, self.state_dtype))
 
     # Adds state and action at time test, reward and terminal at time test + 1
     def append(self, state, action, reward, terminal):
@@ -30,72 +33,90 @@ class ReplayMemory(object):
                                 self.transitions.max)  # Store new transition with maximum priority
         self.t = 0 if terminal else self.t + 1  # Start new episodes with test = 0
 
-    # Returns a transition with blank states where appropriate
-    def _get_transition(self, idx):
-        transition = [None] * (self.history + self.n)
-        transition[self.history - 1] = self.transitions.get(idx)
-        for t in range(self.history - 2, -1, -1):  # e.g. 2 1 0
-            if transition[t + 1].timestep == 0:
-                transition[t] = blank_trans  # If future frame has timestep 0
-            else:
-                transition[t] = self.transitions.get(idx - self.history + 1 + t)
-        for t in range(self.history, self.history + self.n):  # e.g. 4 5 6
-            if transition[t - 1].nonterminal:
-                transition[t] = self.transitions.get(idx - self.history + 1 + t)
-            else:
-                transition[t] = blank_trans  # If prev (next) frame is terminal
-        return transition
-
-    # Returns a valid sample from a segment
-    def _get_sample_from_segment(self, segment, i):
-        valid = False
-        while not valid:
-            sample = random.uniform(i * segment, (i + 1) * segment)  # Uniformly sample an element from within a segment
-            # Retrieve sample from tree with un-normalised probability
-            prob, idx, tree_idx = self.transitions.find(sample)
+    # Draws one valid sample from each of the batch size segments at once
+    def _sample_indices(self, segment, batch_size):
+        segment_starts = np.arange(batch_size) * segment
+        probs = np.zeros(batch_size, dtype=np.float32)
+        idxs, tree_idxs = np.zeros(batch_size, dtype=np.int64), np.zeros(batch_size, dtype=np.int64)
+        invalid = np.arange(batch_size)
+        while len(invalid):
+            # Uniformly sample an element from within each segment
+            samples = segment_starts[invalid] + torch.rand(len(invalid), dtype=torch.float64).numpy() * segment
+            # Retrieve samples from tree with un-normalised probability
+            probs[invalid], idxs[invalid], tree_idxs[invalid] = self.transitions.find_batch(samples)
             # Resample if transition straddled current index or probablity 0
-            if (self.transitions.index - idx) % self.capacity > self.n \
-               and (idx - self.transitions.index) % self.capacity >= self.history and prob != 0:
-                valid = True  # Note that conditions are valid but extra conservative around buffer index 0
+            # (note that conditions are valid but extra conservative around buffer index 0)
+            valid = ((self.transitions.index - idxs[invalid]) % self.capacity > self.n) \
+                & ((idxs[invalid] - self.transitions.index) % self.capacity >= self.history) & (probs[invalid] != 0)
+            invalid = invalid[~valid]
+        return probs, idxs, tree_idxs
 
-        # Retrieve all required transition data (from test - h to test + n)
-        transition = self._get_transition(idx)
-        # Create un-discretised state and nth next state
-        state = torch.stack([trans.state for trans in transition[:self.history]]).to(dtype=torch.float32,
-                                                                                     device=self.device)
-        next_state = torch.stack([trans.state for trans in transition[self.n:self.n + self.history]]).to(
-            dtype=torch.float32, device=self.device)
+    # Gathers frames t - h + 1 to t + n of every sampled index, masking frames of other episodes as blank
+    def _get_transitions(self, idxs):
+        data = self.transitions.data
+        frame_idxs = (idxs[:, None] + np.arange(-self.history + 1, self.n + 1)[None, :]) % self.capacity
+        timesteps, nonterminals = data.timesteps[frame_idxs], data.nonterminals[frame_idxs]
 
-        # Discrete action to be used as index
-        action = torch.tensor([transition[self.history - 1].action], dtype=torch.int64, device=self.device)
-        # Calculate truncated n-step discounted return R^n = Σ_k=0->n-1 (γ^k)R_t+k+1
-        # (note that invalid nth next states have reward 0)
-        R = torch.tensor([sum(self.discount ** n * transition[self.history + n - 1].reward for n in range(self.n))],
-                         dtype=torch.float32, device=self.device)
-        # Mask for non-terminal nth next states
-        nonterminal = torch.tensor([transition[self.history + self.n - 1].nonterminal], dtype=torch.float32,
-                                   device=self.device)
+        valid = np.ones(frame_idxs.shape, dtype=np.bool_)
+        for t in range(self.history - 2, -1, -1):  # e.g. 2 1 0, blank if future frame has timestep 0
+            valid[:, t] = valid[:, t + 1] & (timesteps[:, t + 1] != 0)
+        for t in range(self.history, self.history + self.n):  # e.g. 4 5 6, blank if prev (next) frame is terminal
+            valid[:, t] = valid[:, t - 1] & nonterminals[:, t - 1]
 
-        return prob, idx, tree_idx, state, action, R, next_state, nonterminal
+        states = data.decode_states(data.states[frame_idxs])
+        states[~valid] = 0
+        rewards = np.where(valid, data.rewards[frame_idxs], 0)
+        return states, rewards, nonterminals & valid
 
-    def sample(self, batch_size):
+    def sample_arrays(self, batch_size):
+        """
+        Samples a batch as numpy arrays on host memory.
+        :return: tree indices, frames t - h + 1 to t + n, actions, returns, nonterminals and weights.
+        """
         # Retrieve sum of all priorities (used to create a normalised probability distribution)
         p_total = self.transitions.total()
         segment = p_total / batch_size  # Batch size number of segments, based on sum over all probabilities
-        batch = [self._get_sample_from_segment(segment, i) for i in range(batch_size)]  # Get batch of valid samples
-        probs, idxs, tree_idxs, states, actions, returns, next_states, nonterminals = zip(*batch)
-        states, next_states, = torch.stack(states), torch.stack(next_states)
-        actions, returns, nonterminals = torch.cat(actions), torch.cat(returns), torch.stack(nonterminals)
-        probs = torch.tensor(probs, dtype=torch.float32,
-                             device=self.device) / p_total  # Calculate normalised probabilities
+        probs, idxs, tree_idxs = self._sample_indices(segment, batch_size)  # Get batch of valid samples
+
+        # Retrieve all required transition data (from t - h to t + n)
+        frames, rewards, nonterminals = self._get_transitions(idxs)
+
+        # Discrete action to be used as index
+        actions = self.transitions.data.actions[idxs]
+        # Calculate truncated n-step discounted return R^n = Σ_k=0->n-1 (γ^k)R_t+k+1
+        # (note that invalid nth next states have reward 0)
+        discounts = self.discount ** np.arange(self.n)
+        returns = (rewards[:, self.history - 1:self.history + self.n - 1] @ discounts).astype(np.float32)
+        # Mask for non-terminal nth next states
+        nonterminals = nonterminals[:, self.history + self.n - 1:].astype(np.float32)
+
+        probs = probs / p_total  # Calculate normalised probabilities
         capacity = self.capacity if self.transitions.full else self.transitions.index
         weights = (capacity * probs) ** -self.priority_weight  # Compute importance-sampling weights w
-        weights = weights / weights.max()  # Normalise by max importance-sampling weight from batch
+        if self.global_weight_normalisation:
+            # Normalise by max importance-sampling weight over memory, which belongs to the minimum priority
+            max_weight = (capacity * float(self.transitions.min()) / p_total) ** -self.priority_weight
+        else:
+            max_weight = weights.max()  # Normalise by max importance-sampling weight from batch
+        weights = (weights / max_weight).astype(np.float32)
+        return tree_idxs, frames, actions, returns, nonterminals, weights
+
+    def sample(self, batch_size):
+        tree_idxs, frames, actions, returns, nonterminals, weights = self.sample_arrays(batch_size)
+        # Create un-discretised state and nth next state
+        frames = torch.from_numpy(frames).to(dtype=torch.float32, device=self.device)
+        states, next_states = self.split_frames(frames)
+        actions, returns, nonterminals, weights = [torch.from_numpy(a).to(device=self.device)
+                                                   for a in (actions, returns, nonterminals, weights)]
         return tree_idxs, states, actions, returns, next_states, nonterminals, weights
 
+    def split_frames(self, frames):
+        """:return: states and nth next states, views of the sampled frames."""
+        return frames[:, :self.history], frames[:, self.n:self.n + self.history]
+
     def update_priorities(self, idxs, priorities):
         priorities.pow_(self.priority_exponent)
-        [self.transitions.update(idx, priority) for idx, priority in zip(idxs, priorities)]
+        self.transitions.update_batch(idxs, priorities.cpu().numpy())
 
     # Set up internal state for iterator
     def __iter__(self):
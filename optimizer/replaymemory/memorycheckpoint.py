@@ -0,0 +1,118 @@
+import json
+import logging
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from optimizer.replaymemory.memory import ReplayMemory
+from optimizer.replaymemory.transitionstore import TransitionStore
+from optimizer.util import fileutil
+
+
+class MemoryCheckpoint(object):
+    """
+    A replay memory checkpoint directory:
+        states.npy:  every state frame, memory-mappable, preallocated to capacity.
+        arrays.npz:  timesteps, actions, rewards, nonterminals and priority trees.
+        meta.json:   small header with cursor, shapes and the mark of the save.
+
+    Saves are incremental: only frames appended since the last save are written
+    into states.npy, the small arrays and the header are replaced atomically.
+    Loads map states.npy copy-on-write instead of reading it into memory.
+    """
+
+    VERSION = 1
+    STATES_FILENAME = 'states.npy'
+    ARRAYS_FILENAME = 'arrays.npz'
+    META_FILENAME = 'meta.json'
+
+    def __init__(self, dirname: str):
+        self.dirname = dirname
+        self.logger = logging.getLogger(__name__)
+        # Tree of the memory last saved or loaded here, only its new frames need writing.
+        self._synced_tree = None
+
+    def read_meta(self) -> Optional[dict]:
+        filename = self._path(self.META_FILENAME)
+        if not fileutil.file_exists(filename):
+            return None
+
+        with open(filename) as f:
+            meta = json.load(f)
+        return meta if meta.get('version') == self.VERSION else None
+
+    def save(self, mem: ReplayMemory, mark: Tuple[int, int]):
+        tree, store = mem.transitions, mem.transitions.data
+        os.makedirs(self.dirname, exist_ok=True)
+
+        meta = self.read_meta()
+        states_filename = self._path(self.STATES_FILENAME)
+        if self._synced_tree is tree and meta is not None and self._is_compatible(meta, mem) \
+                and fileutil.file_exists(states_filename):
+            states = np.load(states_filename, mmap_mode='r+')
+            num_new = tree.appended - meta['appended']
+        else:
+            states = np.lib.format.open_memmap(states_filename, mode='w+', dtype=store.states.dtype,
+                                               shape=store.states.shape)
+            num_new = tree.appended
+
+        if num_new:
+            slots = (tree.index - np.arange(min(num_new, mem.capacity), 0, -1)) % mem.capacity
+            states[slots] = store.states[slots]
+            states.flush()
+        del states
+
+        self._replace(self.ARRAYS_FILENAME, lambda f: np.savez(
+            f, timesteps=store.timesteps, actions=store.actions, rewards=store.rewards,
+            nonterminals=store.nonterminals, sum_tree=tree.sum_tree, min_tree=tree.min_tree))
+        meta = {
+            'version': self.VERSION,
+            'mark': list(mark),
+            't': mem.t,
+            'index': tree.index,
+            'full': tree.full,
+            'max': float(tree.max),
+            'appended': tree.appended,
+            'capacity': mem.capacity,
+            'state_shape': list(store.states.shape[1:]),
+            'state_dtype': store.state_dtype,
+        }
+        self._replace(self.META_FILENAME, lambda f: f.write(json.dumps(meta).encode('utf-8')))
+        self._synced_tree = tree
+
+    def load(self, mem: ReplayMemory) -> bool:
+        meta = self.read_meta()
+        if meta is None:
+            return False
+        if not self._is_compatible(meta, mem):
+            self.logger.info('Checkpoint %s doesn\'t fit a memory of capacity %d.' % (self.dirname, mem.capacity))
+            return False
+
+        tree, store = mem.transitions, mem.transitions.data
+        with np.load(self._path(self.ARRAYS_FILENAME)) as arrays:
+            store.timesteps, store.actions = arrays['timesteps'], arrays['actions']
+            store.rewards, store.nonterminals = arrays['rewards'], arrays['nonterminals']
+            tree.sum_tree, tree.min_tree = arrays['sum_tree'], arrays['min_tree']
+        # Copy-on-write, appending to the memory never touches the file.
+        store.states = np.load(self._path(self.STATES_FILENAME), mmap_mode='c')
+
+        mem.t = meta['t']
+        tree.index, tree.full, tree.max, tree.appended = meta['index'], meta['full'], meta['max'], meta['appended']
+        self._synced_tree = tree
+        return True
+
+    @staticmethod
+    def _is_compatible(meta: dict, mem: ReplayMemory) -> bool:
+        store: TransitionStore = mem.transitions.data
+        return meta['capacity'] == mem.capacity and tuple(meta['state_shape']) == store.states.shape[1:] \
+            and meta['state_dtype'] == store.state_dtype
+
+    def _replace(self, filename: str, write):
+        tmp_filename = self._path(filename + '.tmp')
+        with open(tmp_filename, 'wb') as f:
+            write(f)
+        os.replace(tmp_filename, self._path(filename))
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.dirname, filename)
@@ -1,55 +1,68 @@
+import os
 import pickle
 
+from optimizer.hyperparameters import STATE_SHAPE
 from optimizer.replaymemory import ReplayMemoryProxy
+from optimizer.replaymemory.memorycheckpoint import MemoryCheckpoint
+from optimizer.replaymemory.transitionstore import TransitionStore
 from optimizer.util import fileutil
 
 
 class MemorySerializer(object):
+    """
+    Saves replay memory into a checkpoint directory. Every save of pre-training
+    appends to the same checkpoint and records the (action index, file index)
+    it was made after, (-1, -1) standing for the final save.
+    """
 
-    FINAL_SAVE_FILENAME = './results/pre-train-replay-memory.pk'
-    MEMORY_FILENAME_TEMPLATE = './results/pre-train-replay-memory-%d-%d.pk'
+    CHECKPOINT_DIRNAME = './results/pre-train-replay-memory'
 
     def __init__(self, proxy: ReplayMemoryProxy):
         self.mem = proxy.memory
+        self._checkpoints = {}
 
     def try_load(self, action_index=-1, file_index=-1):
         """
-        Load from a file.
+        Load the pre-training checkpoint if it was saved after (action_index, file_index).
         :return: Whether load succeed.
         """
-        if action_index == -1 or file_index == -1:
-            filename = self.FINAL_SAVE_FILENAME
-        else:
-            filename = self._get_serialized_memory_filename(action_index, file_index)
+        checkpoint = self._checkpoint(self.CHECKPOINT_DIRNAME)
+        meta = checkpoint.read_meta()
+        if meta is None or tuple(meta['mark']) != (action_index, file_index):
+            print('Checkpoint: ', self.CHECKPOINT_DIRNAME, "of", (action_index, file_index), "doesn't exist.")
+            return False
 
-        return self.try_load_by_filename(filename)
+        return checkpoint.load(self.mem)
 
     def try_load_by_filename(self, filename):
+        """Load from a checkpoint directory, or a pickle file of older versions."""
         mem = self.mem
 
+        if os.path.isdir(filename):
+            return self._checkpoint(filename).load(mem)
+
         if not fileutil.file_exists(filename):
             print('File: ', filename, "doesn't exist.")
             return False
 
         with open(filename, 'rb') as f:
             mem.t, mem.transitions = pickle.load(f)
-            return True
+
+        if not isinstance(mem.transitions.data, TransitionStore):
+            mem.transitions.data = TransitionStore.from_transitions(mem.transitions.data, STATE_SHAPE,
+                                                                   mem.state_dtype)
+        return True
 
     def save(self, action_index=-1, file_index=-1):
         """
-        Save into a file.
+        Save transitions appended since the last save into the pre-training checkpoint.
         """
-        if action_index == -1 or file_index == -1:
-            filename = self.FINAL_SAVE_FILENAME
-        else:
-            filename = self._get_serialized_memory_filename(action_index, file_index)
+        self._checkpoint(self.CHECKPOINT_DIRNAME).save(self.mem, (action_index, file_index))
 
-        self.save_as(filename)
-
-    def save_as(self, filename: str):
-        mem = self.mem
-        with open(filename, 'wb') as f:
-            pickle.dump([mem.t, mem.transitions], f)
+    def save_as(self, dirname: str):
+        self._checkpoint(dirname).save(self.mem, (-1, -1))
 
-    def _get_serialized_memory_filename(self, action_index, file_index):
-        return self.MEMORY_FILENAME_TEMPLATE % (action_index, file_index)
+    def _checkpoint(self, dirname: str) -> MemoryCheckpoint:
+        if dirname not in self._checkpoints:
+            self._checkpoints[dirname] = MemoryCheckpoint(dirname)
+        return self._checkpoints[dirname]
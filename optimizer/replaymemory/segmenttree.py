@@ -2,47 +2,78 @@ import numpy as np
 
 
 # Segment tree data structure where parent node values are sum/max of children node values
+# A min tree over the same nodes tracks the minimum priority of written leaves
 class SegmentTree(object):
 
-    def __init__(self, size):
+    def __init__(self, size, data=None):
         self.index = 0
         self.size = size
         self.full = False  # Used to track actual capacity
+        self.appended = 0  # Number of data ever appended
         # Initialise fixed size tree with all (priority) zeros
         self.sum_tree = np.zeros((2 * size - 1, ), dtype=np.float32)
-        self.data = np.array([None] * size)  # Wrap-around cyclic buffer
+        # Leaves never written hold inf so they don't count as minimum
+        self.min_tree = np.full((2 * size - 1, ), np.inf, dtype=np.float32)
+        # Wrap-around cyclic buffer, any storage indexable by data index
+        self.data = data if data is not None else np.array([None] * size)
         self.max = 1  # Initial max value to return (1 = 1^ω)
 
     # Propagates value up tree given a tree index
-    def _propagate(self, index, value):
-        parent = (index - 1) // 2
-        left, right = 2 * parent + 1, 2 * parent + 2
-        self.sum_tree[parent] = self.sum_tree[left] + self.sum_tree[right]
-        if parent != 0:
-            self._propagate(parent, value)
+    def _propagate(self, index):
+        while index != 0:
+            index = (index - 1) // 2
+            left, right = 2 * index + 1, 2 * index + 2
+            self.sum_tree[index] = self.sum_tree[left] + self.sum_tree[right]
+            self.min_tree[index] = min(self.min_tree[left], self.min_tree[right])
+
+    # Propagates many tree indices up tree, one depth at a time so children are always ready before parents
+    def _propagate_batch(self, indices):
+        depths = np.frexp(indices + 1)[1] - 1  # Depth of a node is floor(log2(index + 1))
+        for depth in range(depths.max(), 0, -1):
+            moving = depths == depth
+            # Nodes sharing a parent write the same value, so duplicates need no filtering
+            parents = (indices[moving] - 1) // 2
+            indices[moving], depths[moving] = parents, depth - 1
+            left, right = 2 * parents + 1, 2 * parents + 2
+            self.sum_tree[parents] = self.sum_tree[left] + self.sum_tree[right]
+            self.min_tree[parents] = np.minimum(self.min_tree[left], self.min_tree[right])
 
     # Updates value given a tree index
     def update(self, index, value):
         self.sum_tree[index] = value  # Set new value
-        self._propagate(index, value)  # Propagate value
+        self.min_tree[index] = value
+        self._propagate(index)  # Propagate value
         self.max = max(value, self.max)
 
+    # Updates values given tree indices, recomputing each affected parent once
+    def update_batch(self, indices, values):
+        indices, values = np.asarray(indices, dtype=np.int64), np.asarray(values, dtype=np.float32)
+        if len(indices) == 0:
+            return
+        self.sum_tree[indices] = values  # Set new values
+        self.min_tree[indices] = values
+        self._propagate_batch(indices.copy())  # Propagate values
+        self.max = max(float(values.max()), self.max)
+
     def append(self, data, value):
         self.data[self.index] = data  # Store data in underlying data structure
         self.update(self.index + self.size - 1, value)  # Update tree
         self.index = (self.index + 1) % self.size  # Update index
         self.full = self.full or self.index == 0  # Save when capacity reached
+        self.appended += 1
         self.max = max(value, self.max)
 
     # Searches for the location of a value in sum tree
     def _retrieve(self, index, value):
-        left, right = 2 * index + 1, 2 * index + 2
-        if left >= len(self.sum_tree):
-            return index
-        elif value <= self.sum_tree[left]:
-            return self._retrieve(left, value)
-        else:
-            return self._retrieve(right, value - self.sum_tree[left])
+        while True:
+            left, right = 2 * index + 1, 2 * index + 2
+            if left >= len(self.sum_tree):
+                return index
+            elif value <= self.sum_tree[left]:
+                index = left
+            else:
+                value -= self.sum_tree[left]
+                index = right
 
     # Searches for a value in sum tree and returns value, data index and tree index
     def find(self, value):
@@ -50,9 +81,38 @@ class SegmentTree(object):
         data_index = index - self.size + 1
         return self.sum_tree[index], data_index, index  # Return value, data index, tree index
 
+    # Searches for many values at once, walking the tree level by level
+    def find_batch(self, values: np.ndarray):
+        values = np.array(values, dtype=np.float64)
+        indices = np.zeros(values.shape, dtype=np.int64)
+        active = 2 * indices + 1 < len(self.sum_tree)
+        while active.any():
+            left = 2 * indices[active] + 1
+            left_values = self.sum_tree[left]
+            go_left = values[active] <= left_values
+            values[active] = np.where(go_left, values[active], values[active] - left_values)
+            indices[active] = np.where(go_left, left, left + 1)
+            active = 2 * indices + 1 < len(self.sum_tree)
+        data_indices = indices - self.size + 1
+        return self.sum_tree[indices], data_indices, indices  # Return values, data indices, tree indices
+
     # Returns data given a data index
     def get(self, data_index):
         return self.data[data_index % self.size]
 
     def total(self):
         return self.sum_tree[0]
+
+    # Minimum priority of all written transitions
+    def min(self):
+        return self.min_tree[0]
+
+    # Rebuilds the fields of trees pickled before they existed
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if 'appended' not in state:
+            self.appended = self.size if self.full else self.index
+        if 'min_tree' not in state:
+            self.min_tree = np.full(self.sum_tree.shape, np.inf, dtype=np.float32)
+            written = np.arange(self.size if self.full else self.index) + self.size - 1
+            self.update_batch(written, self.sum_tree[written])
@@ -0,0 +1,53 @@
+import threading
+
+from optimizer.replaymemory.memoryproxy import ReplayMemoryProxy
+
+
+class SynchronizedMemoryProxy(object):
+    """
+    Serializes access to a ReplayMemoryProxy shared by an actor and a learner thread.
+    The lock is only held while memory is read or written, never during SGD.
+    """
+
+    def __init__(self, proxy: ReplayMemoryProxy):
+        self._proxy = proxy
+        self._lock = threading.Lock()
+        self._appended = threading.Condition(self._lock)
+        # Number of transitions appended through this proxy
+        self.appended = 0
+
+    def append(self, state, action, reward, terminal):
+        with self._lock:
+            self._proxy.append(state, action, reward, terminal)
+            self.appended += 1
+            self._appended.notify_all()
+
+    def wait_appended(self, count: int, timeout: float) -> bool:
+        """Waits until count transitions have been appended, returns whether they have."""
+        with self._lock:
+            return self._appended.wait_for(lambda: self.appended >= count, timeout)
+
+    def terminate(self):
+        with self._lock:
+            self._proxy.terminate()
+
+    def sample(self, batch_size):
+        with self._lock:
+            return self._proxy.sample(batch_size)
+
+    def update_priorities(self, idxs, priorities):
+        with self._lock:
+            return self._proxy.update_priorities(idxs, priorities)
+
+    @property
+    def memory(self):
+        return self._proxy.memory
+
+    @property
+    def priority_weight(self):
+        return self._proxy.priority_weight
+
+    @priority_weight.setter
+    def priority_weight(self, value):
+        with self._lock:
+            self._proxy.priority_weight = value
@@ -0,0 +1,71 @@
+from typing import Tuple
+
+import numpy as np
+import torch
+
+from optimizer.replaymemory.transition import Transition
+
+
+class TransitionStore(object):
+    """
+    Structure-of-arrays storage of transitions for SegmentTree.data.
+    All states live in one contiguous buffer next to timestep, action,
+    reward and nonterminal arrays, instead of one tensor per Transition.
+
+    States are stored as
+        float32: exact values.
+        float16: sign(x) * log(1 + |x|), below 1% relative error and no
+                 overflow for large values such as timestamps, half the memory.
+    """
+
+    STATE_DTYPES = {
+        'float32': np.float32,
+        'float16': np.float16,
+    }
+
+    def __init__(self, size: int, state_shape: Tuple[int, int], state_dtype: str = 'float32'):
+        self.size = size
+        self.state_dtype = state_dtype
+        self.timesteps = np.zeros((size, ), dtype=np.int64)
+        self.states = np.zeros((size, *state_shape), dtype=self.STATE_DTYPES[state_dtype])
+        self.actions = np.full((size, ), -1, dtype=np.int64)   # -1 stands for no action
+        self.rewards = np.zeros((size, ), dtype=np.float32)
+        self.nonterminals = np.zeros((size, ), dtype=np.bool_)
+
+    def __setitem__(self, index: int, transition: Transition):
+        self.timesteps[index] = transition.timestep
+        self.states[index] = self.encode_states(transition.state.numpy())
+        self.actions[index] = -1 if transition.action is None else transition.action
+        self.rewards[index] = 0 if transition.reward is None else transition.reward
+        self.nonterminals[index] = transition.nonterminal
+
+    def __getitem__(self, index: int) -> Transition:
+        return Transition(int(self.timesteps[index]), torch.from_numpy(self.decode_states(self.states[index])),
+                          int(self.actions[index]), float(self.rewards[index]), bool(self.nonterminals[index]))
+
+    def __len__(self):
+        return self.size
+
+    @staticmethod
+    def from_transitions(transitions: np.ndarray, state_shape: Tuple[int, int], state_dtype: str = 'float32'):
+        """Converts an object array of Transition, the storage of older replay memory files."""
+        store = TransitionStore(len(transitions), state_shape, state_dtype)
+        for index, transition in enumerate(transitions):
+            if transition is not None:
+                store[index] = transition
+        return store
+
+    def encode_states(self, states: np.ndarray) -> np.ndarray:
+        if self.state_dtype == 'float16':
+            return np.copysign(np.log1p(np.abs(states)), states)
+        return states
+
+    def decode_states(self, states: np.ndarray) -> np.ndarray:
+        if self.state_dtype == 'float16':
+            states = states.astype(np.float32)
+            return np.copysign(np.expm1(np.abs(states)), states)
+        return states
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.timesteps, self.states, self.actions, self.rewards, self.nonterminals))
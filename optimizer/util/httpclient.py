@@ -0,0 +1,68 @@
+import collections
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from optimizer.util import jsonutil
+
+
+class HttpClient(object):
+    """
+    Keeps a pool of keep-alive connections to RM and Spark History Server
+    and fetches several JSON endpoints concurrently, so that one observation
+    costs max(latency) instead of sum(latency).
+    """
+
+    def __init__(self, pool_size: int = 16, max_workers: int = 8, default_timeout: float = 10.0):
+        self.default_timeout = default_timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # (bytes, seconds) of the latest streamed responses
+        self.parse_stats = collections.deque(maxlen=100)
+        self.logger = logging.getLogger(__name__)
+
+    def get_json(self, url: str, timeout: Optional[float] = None) -> Dict[str, object]:
+        return jsonutil.get_json(url, timeout or self.default_timeout, self.session)
+
+    def get_apps_json(self, url: str, fields: Sequence[str], timeout: Optional[float] = None) -> Dict[str, object]:
+        """Streams an RM apps endpoint, keeping only the given fields of every app."""
+        start = time.perf_counter()
+        j, size = jsonutil.get_apps_json(url, fields, timeout or self.default_timeout, self.session)
+        elapsed = time.perf_counter() - start
+        self.parse_stats.append((size, elapsed))
+        self.logger.debug('Fetched and parsed %d bytes in %.3fs (%.2f MB/s): %s' %
+                          (size, elapsed, size / max(elapsed, 1e-9) / 1e6, url))
+        return j
+
+    def put(self, url: str, data: str, headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = None) -> requests.Response:
+        return self.session.put(url, data=data.encode('utf-8'), headers=headers, timeout=timeout or self.default_timeout)
+
+    def get_json_concurrently(self, urls: Dict[str, str], timeouts: Optional[Dict[str, float]] = None,
+                              app_fields: Optional[Dict[str, Sequence[str]]] = None) -> Dict[str, Dict[str, object]]:
+        """
+        Fetches every url at the same time.
+        :param urls: Endpoint name to url.
+        :param timeouts: Endpoint name to timeout in seconds, missing ones use the default timeout.
+        :param app_fields: Endpoint name to app fields, these RM apps endpoints are streamed by get_apps_json.
+        :return: Endpoint name to parsed JSON. Re-raises the first error met.
+        """
+        timeouts, app_fields = timeouts or {}, app_fields or {}
+        futures = {}
+        for name, url in urls.items():
+            if name in app_fields:
+                futures[name] = self.executor.submit(self.get_apps_json, url, app_fields[name], timeouts.get(name))
+            else:
+                futures[name] = self.executor.submit(self.get_json, url, timeouts.get(name))
+        return {name: future.result() for name, future in futures.items()}
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
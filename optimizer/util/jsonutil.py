@@ -1,11 +1,81 @@
+import codecs
+import itertools
 import json
-from typing import Dict
+import re
+from typing import Dict, Iterable, Optional, Sequence, Tuple
 
 import requests
 
+# Start of the app array of an RM apps response, {"apps": {"app": [...]}}.
+_APP_ARRAY = re.compile(r'"app"\s*:\s*\[')
+_SEPARATORS = re.compile(r'[\s,]*')
+_decoder = json.JSONDecoder()
 
-def get_json(url: str) -> Dict[str, object]:
-    r = requests.get(url)
+
+def get_json(url: str, timeout: Optional[float] = None, session: Optional[requests.Session] = None) -> Dict[str, object]:
+    r = (session or requests).get(url, timeout=timeout)
+    return response_to_json(r)
+
+
+def response_to_json(r: requests.Response) -> Dict[str, object]:
     r.raise_for_status()
-    r.encoding = r.apparent_encoding
-    return json.loads(r.text)
+    # JSON is UTF-8 (or UTF-16/32, detected by json.loads), sniffing the charset of a large body is slow.
+    return json.loads(r.content)
+
+
+def get_apps_json(url: str, fields: Sequence[str], timeout: Optional[float] = None,
+                  session: Optional[requests.Session] = None,
+                  chunk_size: int = 64 * 1024) -> Tuple[Dict[str, object], int]:
+    with (session or requests).get(url, timeout=timeout, stream=True) as r:
+        r.raise_for_status()
+        return stream_apps_json(r.iter_content(chunk_size), fields)
+
+
+def stream_apps_json(chunks: Iterable[bytes], fields: Sequence[str]) -> Tuple[Dict[str, object], int]:
+    """
+    Parses an RM apps response chunk by chunk.
+    Every app is decoded as soon as its last byte arrives and only the given
+    fields of it are kept, so the whole body is never held as one string.
+    :return: The response with trimmed apps, and the number of bytes read.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    text, pos, apps, size, done = '', None, [], 0, False
+
+    for chunk in itertools.chain(chunks, [None]):
+        final = chunk is None
+        if not final:
+            size += len(chunk)
+        # Read the rest of the body after the array, so that the connection can be reused.
+        if done:
+            continue
+        text += decoder.decode(chunk or b'', final=final)
+
+        if pos is None:
+            match = _APP_ARRAY.search(text)
+            if match is None:
+                if final:
+                    # No app array, like {"apps": null}.
+                    return json.loads(text), size
+                continue
+            pos = match.end()
+
+        while True:
+            pos = _SEPARATORS.match(text, pos).end()
+            if pos == len(text):
+                break
+            if text[pos] == ']':
+                done = True
+                break
+            try:
+                app, end = _decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break
+            apps.append({field: app[field] for field in fields if field in app})
+            pos = end
+        text, pos = text[pos:], 0
+
+    if not done:
+        raise json.JSONDecodeError('Unterminated app array', text, pos)
+    return {'apps': {'app': apps}}, size
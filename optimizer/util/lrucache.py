@@ -0,0 +1,53 @@
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class LruCache(object):
+    """
+    A least-recently-used cache whose entries also expire after ttl seconds.
+    Counts hits and misses for monitoring.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable, default=None):
+        entry = self._data.get(key)
+        if entry is None or self._expired(entry[0]):
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value):
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _expired(self, inserted_at: float) -> bool:
+        return self.ttl is not None and time.monotonic() - inserted_at > self.ttl
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: Hashable):
+        entry = self._data.get(key)
+        return entry is not None and not self._expired(entry[0])
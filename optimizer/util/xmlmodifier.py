@@ -1,3 +1,5 @@
+from typing import Dict, List
+
 from bs4 import BeautifulSoup
 
 
@@ -31,3 +33,29 @@ class XmlModifier(object):
     def save(self):
         with open(self.to_filename, 'w') as f:
             f.write(self.data.prettify())
+
+
+class XmlTemplate(object):
+    """
+    A XML file parsed and prettified once, whose values of the given keys
+    are filled in by plain string substitution on every render.
+    """
+
+    def __init__(self, filename: str, keys: List[str]):
+        with open(filename, 'r') as f:
+            data = BeautifulSoup(f.read(), features='lxml-xml')
+
+        values = {n.string: n.find_next_sibling('value') for n in data.find_all('name')}
+        self.placeholders = {}
+        for index, key in enumerate(keys):
+            if key not in values:
+                raise KeyError('%s is not in %s' % (key, filename))
+            self.placeholders[key] = '@@%d@@' % index
+            values[key].string = self.placeholders[key]
+        self.text = data.prettify()
+
+    def render(self, values: Dict[str, object]) -> str:
+        text = self.text
+        for key, placeholder in self.placeholders.items():
+            text = text.replace(placeholder, str(values[key]))
+        return text
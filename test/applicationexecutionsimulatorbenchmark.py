@@ -0,0 +1,110 @@
+import random
+import time
+import tracemalloc
+from typing import List
+
+from optimizer.environment.spark import simulationmodel
+from optimizer.environment.spark.applicationexecutionsimulator import ApplicationExecutionSimulator
+
+
+class ReferenceApplicationExecutionSimulator(object):
+    """The original simulator, which re-plans every waiting task whenever a container is added."""
+
+    def __init__(self):
+        self.containers: List[simulationmodel.Container] = []
+
+    def simulate(self, container_additions: List[simulationmodel.Container], tasks: List[simulationmodel.Task]):
+        self.containers.clear()
+        container_additions.sort(key=lambda item: item.start_time)
+        container_additions = [c for c in container_additions if c.is_active]
+        if len(container_additions) == 0:
+            return 0
+
+        tasks.sort(key=lambda item: item.id)
+        container_additions[0].add_tasks(tasks)
+        for addition in container_additions:
+            self.containers.append(addition)
+            self.simulate_step(addition.start_time)
+
+        return max([container.finish_time for container in self.containers])
+
+    def simulate_step(self, current_time: int):
+        waiting_tasks = []
+        for c in self.containers:
+            waiting_tasks.extend(c.pop_waiting_tasks(current_time))
+        waiting_tasks.sort(key=lambda item: item.id)
+
+        for task in waiting_tasks:
+            earliest_finish_container = None
+            for cur in self.containers:
+                if earliest_finish_container is None or earliest_finish_container.finish_time > cur.finish_time:
+                    earliest_finish_container = cur
+            earliest_finish_container.add_task(task)
+
+
+def random_workload(num_tasks: int, num_containers: int, seed: int):
+    random.seed(seed)
+    containers = [simulationmodel.Container(random.randint(0, 20) * 1000, random.random() < 0.9)
+                  for _ in range(num_containers)]
+    # Integer running times make ties between containers common.
+    tasks = [simulationmodel.Task(i, random.choice([500, 1000, 1500, random.random() * 2000]))
+             for i in range(num_tasks)]
+    random.shuffle(tasks)
+    return containers, tasks
+
+
+def expand_task_runs(task_runs: List[simulationmodel.TaskRun]) -> List[simulationmodel.Task]:
+    tasks = []
+    for run in task_runs:
+        tasks.extend(simulationmodel.Task(len(tasks), run.running_time) for _ in range(run.count))
+    return tasks
+
+
+def peak_memory(f, *args):
+    tracemalloc.start()
+    result = f(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak
+
+
+def timed_simulate(simulator, num_tasks: int, num_containers: int, seed: int):
+    containers, tasks = random_workload(num_tasks, num_containers, seed)
+    start = time.time()
+    result = simulator.simulate(containers, tasks)
+    return result, time.time() - start
+
+
+if __name__ == '__main__':
+    # Same finish times on small random workloads.
+    for seed in range(300):
+        num_tasks, num_containers = random.Random(seed).randint(0, 200), random.Random(seed).randint(0, 12)
+        expected, _ = timed_simulate(ReferenceApplicationExecutionSimulator(), num_tasks, num_containers, seed)
+        actual, _ = timed_simulate(ApplicationExecutionSimulator(), num_tasks, num_containers, seed)
+        assert expected == actual, (seed, expected, actual)
+
+    print('{:>8} {:>11} {:>12} {:>12}'.format('tasks', 'containers', 'reference', 'heap'))
+    for num_tasks in [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]:
+        for num_containers in [8, 64]:
+            actual, heap_cost = timed_simulate(ApplicationExecutionSimulator(), num_tasks, num_containers, 0)
+            if num_tasks <= 10 ** 4:
+                expected, reference_cost = timed_simulate(
+                    ReferenceApplicationExecutionSimulator(), num_tasks, num_containers, 0)
+                assert expected == actual
+                reference = '{:>10.3f}s'.format(reference_cost)
+            else:
+                reference = '{:>11}'.format('-')
+            print('{:>8} {:>11} {} {:>11.3f}s'.format(num_tasks, num_containers, reference, heap_cost))
+
+    # Task runs give the same result as one task object per block, in flat memory.
+    print()
+    print('{:>8} {:>12} {:>12}'.format('tasks', 'task list', 'task runs'))
+    for num_blocks in [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]:
+        runs = [simulationmodel.TaskRun(num_blocks // 2, 1000.0), simulationmodel.TaskRun(1, 333.3),
+                simulationmodel.TaskRun(num_blocks // 2, 1500.0)]
+        containers, _ = random_workload(0, 16, 0)
+        simulator = ApplicationExecutionSimulator()
+        expected, list_peak = peak_memory(lambda: simulator.simulate(containers, expand_task_runs(runs)))
+        actual, runs_peak = peak_memory(lambda: simulator.simulate_runs(containers, runs))
+        assert expected == actual
+        print('{:>8} {:>10.1f}MB {:>10.3f}MB'.format(num_blocks + 1, list_peak / 2 ** 20, runs_peak / 2 ** 20))
@@ -0,0 +1,98 @@
+import argparse
+import json
+import random
+import time
+
+import requests
+
+from optimizer.environment.yarn.statebuilder import StateBuilder
+from optimizer.hyperparameters import QUEUES
+from optimizer.util.httpclient import HttpClient
+
+from test.stubresourcemanager import StubResourceManager
+
+
+def reference_get_json(session: requests.Session, url: str) -> dict:
+    """The original jsonutil.get_json, sniffing the charset of the whole body."""
+    r = session.get(url)
+    r.raise_for_status()
+    r.encoding = r.apparent_encoding
+    return json.loads(r.text)
+
+
+def random_app(i: int) -> dict:
+    """An RM app with the fields StateBuilder ignores as well."""
+    return {
+        'id': 'application_0_%05d' % i,
+        'user': 'hadoop',
+        'name': random.choice(['SparkPi', 'WordCount', 'PageRank']),
+        'queue': random.choice(QUEUES['names']),
+        'state': 'RUNNING',
+        'finalStatus': 'UNDEFINED',
+        'progress': random.random() * 100,
+        'trackingUI': 'ApplicationMaster',
+        'trackingUrl': 'http://master:8088/proxy/application_0_%05d/' % i,
+        'diagnostics': '',
+        'applicationType': 'SPARK',
+        'applicationTags': '',
+        'priority': random.randint(0, 10),
+        'startedTime': 1560000000000 + i,
+        'finishedTime': 0,
+        'elapsedTime': random.randint(0, 10 ** 7),
+        'amContainerLogs': 'http://slave:8042/node/containerlogs/container_0_%05d_01_000001/hadoop' % i,
+        'amHostHttpAddress': 'slave:8042',
+        'allocatedMB': 4096,
+        'allocatedVCores': 2,
+        'runningContainers': 2,
+        'memorySeconds': random.randint(0, 10 ** 7),
+        'vcoreSeconds': random.randint(0, 10 ** 4),
+        'queueUsagePercentage': random.random() * 100,
+        'clusterUsagePercentage': random.random() * 100,
+        'resourceRequests': [{
+            'priority': random.randint(0, 20),
+            'resourceName': '*',
+            'capability': {'memory': random.choice([1024, 2048, 6144]), 'vCores': random.randint(1, 8)},
+            'numContainers': 1,
+            'relaxLocality': True,
+            'nodeLabelExpression': '',
+            'executionTypeRequest': {'executionType': 'GUARANTEED', 'enforceExecutionType': False},
+        } for _ in range(random.randint(0, 8))],
+    }
+
+
+def trim(j: dict, fields) -> dict:
+    return {'apps': {'app': [{f: app[f] for f in fields if f in app} for app in j['apps']['app']]}}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reports parse time and throughput of large RM app lists.')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed fetches')
+    args = parser.parse_args()
+    random.seed(0)
+    fields = StateBuilder.RUNNING_APP_FIELDS
+
+    print('{:>8} {:>8} {:>12} {:>12} {:>12} {:>10}'.format(
+        'apps', 'MB', 'reference', 'buffered', 'streamed', 'MB/s'))
+    with StubResourceManager() as rm:
+        client = HttpClient()
+        for num_apps in [100, 1000, 10000]:
+            path = '/ws/v1/cluster/apps?states=RUNNING&n=%d' % num_apps
+            rm.add_route(path, {'apps': {'app': [random_app(i) for i in range(num_apps)]}})
+            url = rm.url + path[1:]
+
+            expected = trim(reference_get_json(client.session, url), fields)
+            assert trim(client.get_json(url), fields) == expected, 'Buffered apps differ.'
+            assert client.get_apps_json(url, fields) == expected, 'Streamed apps differ.'
+
+            timings = []
+            for get in [lambda: reference_get_json(client.session, url), lambda: client.get_json(url),
+                        lambda: client.get_apps_json(url, fields)]:
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    get()
+                timings.append((time.perf_counter() - start) / args.repeat)
+
+            size, elapsed = client.parse_stats[-1]
+            print('{:>8} {:>8.2f} {:>10.1f}ms {:>10.1f}ms {:>10.1f}ms {:>10.1f}'.format(
+                num_apps, size / 1e6, *[t * 1000 for t in timings], size / elapsed / 1e6))
+        client.close()
@@ -0,0 +1,84 @@
+import argparse
+import time
+
+import torch
+
+from optimizer.replaymemory import BatchPrefetcher, ReplayMemoryProxy
+from test.replaymemorybenchmark import fill, memory_args
+
+
+def prefetcher_args(device: torch.device, batch_size: int) -> argparse.Namespace:
+    args = memory_args('float32')
+    args.device, args.batch_size = device, batch_size
+    return args
+
+
+def overwritten_slots_test(args: argparse.Namespace):
+    """Priorities of slots appended over after sampling must be left alone."""
+    proxy = ReplayMemoryProxy(args, 500)
+    fill(proxy.memory, 500)
+    prefetcher = BatchPrefetcher(proxy, args, 2)
+    tree_idxs = prefetcher.sample(args.batch_size)[0]
+    fill(prefetcher, 250)  # Appends under the lock the background sampling takes
+    num_overwritten = proxy.memory.transitions.appended - 500
+    overwritten = set(range(proxy.memory.capacity - 1, proxy.memory.capacity - 1 + num_overwritten))
+
+    max_priority = proxy.memory.transitions.max
+    prefetcher.update_priorities(tree_idxs, torch.zeros(len(tree_idxs)))
+    for index in tree_idxs:
+        expected = max_priority if index in overwritten else 0
+        assert proxy.memory.transitions.sum_tree[index] == expected, index
+
+
+def failed_sampling_test(args: argparse.Namespace):
+    """An error of the background sampling is raised by every later sample() instead of blocking."""
+    proxy = ReplayMemoryProxy(args, 500)
+    fill(proxy.memory, 500)
+
+    def sample_arrays(batch_size):
+        raise ValueError('sampling failed')
+    proxy.memory.sample_arrays = sample_arrays
+
+    prefetcher = BatchPrefetcher(proxy, args, 2)
+    for _ in range(3):
+        try:
+            prefetcher.sample(args.batch_size)
+            raise AssertionError('ValueError expected.')
+        except ValueError:
+            pass
+
+
+def learner_wait(mem, batch_size: int, learn_cost: float, repeat: int) -> float:
+    """:return: mean seconds spent in sample() per learning step."""
+    waited = 0.0
+    for _ in range(repeat):
+        start = time.time()
+        idxs = mem.sample(batch_size)[0]
+        waited += time.time() - start
+        time.sleep(learn_cost)  # Stands in for SGD
+        mem.update_priorities(idxs, torch.rand(batch_size))
+    return waited / repeat
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measures how long learning waits on sampling with and without prefetching.')
+    parser.add_argument('--fill', type=int, default=5000, help='Number of transitions appended before sampling')
+    parser.add_argument('--batch-size', type=int, default=32, help='Batch size')
+    parser.add_argument('--prefetch-batches', type=int, default=4, help='Number of batches sampled ahead')
+    parser.add_argument('--learn-cost', type=float, default=0.02, help='Seconds one learning step takes')
+    parser.add_argument('--repeat', type=int, default=100, help='Number of learning steps')
+    args = parser.parse_args()
+
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    mem_args = prefetcher_args(device, args.batch_size)
+    overwritten_slots_test(mem_args)
+    failed_sampling_test(mem_args)
+    print('Overwritten slots and failed sampling tests passed.')
+
+    proxy = ReplayMemoryProxy(mem_args, 10000)
+    fill(proxy.memory, args.fill)
+    direct = learner_wait(proxy, args.batch_size, args.learn_cost, args.repeat)
+    prefetched = learner_wait(BatchPrefetcher(proxy, mem_args, args.prefetch_batches),
+                              args.batch_size, args.learn_cost, args.repeat)
+    print('device: %s, wait per learning step: direct %.2fms, prefetched %.2fms' %
+          (device, direct * 1000, prefetched * 1000))
@@ -0,0 +1,35 @@
+import argparse
+import timeit
+
+import torch
+
+from optimizer.hyperparameters import STATE_SHAPE
+from optimizer.nn import ARCHITECTURES
+
+
+def dqn_args(architecture: str) -> argparse.Namespace:
+    return argparse.Namespace(architecture=architecture, history_length=4, hidden_size=512, noisy_std=0.1, atoms=51,
+                              entity_embedding_size=64)
+
+
+def footprint(net: torch.nn.Module) -> int:
+    tensors = list(net.parameters()) + list(net.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compares size and CPU forward latency of the DQN architectures.')
+    parser.add_argument('--batch-size', type=int, default=32, help='Batch size of the learning forward')
+    parser.add_argument('--repeat', type=int, default=10, help='Number of timed forwards')
+    args = parser.parse_args()
+
+    states = torch.rand(args.batch_size, 4, *STATE_SHAPE)
+    print('{:>10} {:>12} {:>12} {:>12} {:>12}'.format('network', 'parameters', 'footprint', 'act()', 'batch'))
+    for architecture, dqn_class in ARCHITECTURES.items():
+        net = dqn_class(dqn_args(architecture), 10)
+        num_params = sum(p.numel() for p in net.parameters())
+        with torch.no_grad():
+            act = timeit.timeit(lambda: net(states[:1]), number=args.repeat) / args.repeat
+            batch = timeit.timeit(lambda: net(states), number=args.repeat) / args.repeat
+        print('{:>10} {:>12} {:>10.1f}MB {:>10.2f}ms {:>10.2f}ms'.format(
+            architecture, num_params, footprint(net) / 2 ** 20, act * 1000, batch * 1000))
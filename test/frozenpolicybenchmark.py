@@ -0,0 +1,48 @@
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from optimizer.hyperparameters import STATE_SHAPE
+from optimizer.nn import ARCHITECTURES, FrozenPolicy
+from test.dqnbenchmark import dqn_args
+
+
+def eager_act(net: torch.nn.Module, support: torch.Tensor, state: torch.Tensor) -> int:
+    """Agent.act without the DataParallel wrapper."""
+    with torch.no_grad():
+        return (net(state.unsqueeze(0)) * support).sum(2).argmax(1).item()
+
+
+def latencies(act, states) -> np.ndarray:
+    result = []
+    for state in states:
+        start = time.perf_counter()
+        act(state)
+        result.append(time.perf_counter() - start)
+    return np.array(result) * 1000
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reports CPU act() latency percentiles of eager and frozen policies.')
+    parser.add_argument('--repeat', type=int, default=50, help='Number of timed decisions')
+    args = parser.parse_args()
+
+    states = [torch.rand(4, *STATE_SHAPE) for _ in range(args.repeat)]
+    print('{:>10} {:>10} {:>10} {:>10} {:>10} {:>8}'.format('network', 'policy', 'p50', 'p90', 'p99', 'agree'))
+    for architecture, dqn_class in ARCHITECTURES.items():
+        net = dqn_class(dqn_args(architecture), 10).eval()
+        support = torch.linspace(-10, 10, 51)
+        expected = [eager_act(net, support, state) for state in states]
+
+        policies = {'eager': lambda state: eager_act(net, support, state)}
+        for quantize in [False, True]:
+            policy = FrozenPolicy(net, support, states[0], quantize)
+            policies['int8' if quantize else 'frozen'] = policy.act
+
+        for name, act in policies.items():
+            ms = latencies(act, states)
+            agree = np.mean([act(state) == action for state, action in zip(states, expected)])
+            print('{:>10} {:>10} {:>8.2f}ms {:>8.2f}ms {:>8.2f}ms {:>7.0%}'.format(
+                architecture, name, *np.percentile(ms, [50, 90, 99]), agree))
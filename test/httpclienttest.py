@@ -0,0 +1,44 @@
+import time
+
+import requests
+
+from optimizer.util.httpclient import HttpClient
+
+from test.stubresourcemanager import StubResourceManager
+
+DELAY = 0.2
+
+if __name__ == '__main__':
+    with StubResourceManager() as rm:
+        rm.add_route('/ws/v1/cluster/apps?states=NEW,NEW_SAVING,SUBMITTED,ACCEPTED', {'apps': None}, DELAY)
+        rm.add_route('/ws/v1/cluster/apps?states=RUNNING', {'apps': None}, DELAY)
+        rm.add_route('/ws/v1/cluster/nodes', {'nodes': {'node': []}}, DELAY)
+        rm.add_route('/ws/v1/cluster/scheduler', {'scheduler': {}}, DELAY)
+        urls = {
+            'waiting_apps': rm.url + 'ws/v1/cluster/apps?states=NEW,NEW_SAVING,SUBMITTED,ACCEPTED',
+            'running_apps': rm.url + 'ws/v1/cluster/apps?states=RUNNING',
+            'nodes': rm.url + 'ws/v1/cluster/nodes',
+            'scheduler': rm.url + 'ws/v1/cluster/scheduler',
+        }
+
+        client = HttpClient()
+        start = time.time()
+        sequential = {name: client.get_json(url) for name, url in urls.items()}
+        sequential_cost = time.time() - start
+
+        start = time.time()
+        concurrent = client.get_json_concurrently(urls)
+        concurrent_cost = time.time() - start
+
+        assert sequential == concurrent
+        assert concurrent_cost < 2 * DELAY, concurrent_cost
+        print('Sequential: %.3fs, concurrent: %.3fs' % (sequential_cost, concurrent_cost))
+
+        # A slow endpoint only fails itself with its own timeout.
+        rm.add_route('/slow', {}, 1.0)
+        try:
+            client.get_json_concurrently({'nodes': urls['nodes'], 'slow': rm.url + 'slow'}, {'slow': 0.1})
+            raise AssertionError('Timeout expected.')
+        except requests.exceptions.Timeout as e:
+            print('Per-endpoint timeout:', type(e).__name__)
+        client.close()
@@ -0,0 +1,48 @@
+import timeit
+
+import torch
+from torch.nn import functional as F
+
+from optimizer.nn.noisylinear import NoisyLinear
+
+
+def reference_forward(layer: NoisyLinear, input: torch.Tensor) -> torch.Tensor:
+    """The original forward, which materializes the dense noisy weight."""
+    weight_epsilon = layer.bias_epsilon.ger(layer.epsilon_in)
+    return F.linear(input, layer.weight_mu + layer.weight_sigma * weight_epsilon,
+                    layer.bias_mu + layer.bias_sigma * layer.bias_epsilon)
+
+
+def equivalence_test(num_cases: int = 50):
+    for case in range(num_cases):
+        torch.manual_seed(case)
+        in_features, out_features = torch.randint(1, 600, (2, )).tolist()
+        layer = NoisyLinear(in_features, out_features, std_init=0.5)
+        for _ in range(3):
+            layer.reset_noise()
+            input = torch.randn(torch.randint(1, 40, (1, )).item(), in_features)
+            with torch.no_grad():
+                assert torch.allclose(layer(input), reference_forward(layer, input), rtol=1e-4, atol=1e-5), case
+
+
+def load_dense_state_dict_test():
+    layer = NoisyLinear(30, 20)
+    state_dict = layer.state_dict()
+    del state_dict['epsilon_in']
+    state_dict['weight_epsilon'] = torch.zeros(20, 30)
+    layer.load_state_dict(state_dict)
+
+
+if __name__ == '__main__':
+    equivalence_test()
+    load_dense_state_dict_test()
+    print('Equivalence test passed.')
+
+    layer = NoisyLinear(70688, 512)
+    input = torch.randn(32, 70688)
+    with torch.no_grad():
+        reference = timeit.timeit(lambda: reference_forward(layer, input), number=5) / 5
+        factorised = timeit.timeit(lambda: layer(input), number=5) / 5
+        reset = timeit.timeit(layer.reset_noise, number=5) / 5
+    print('70688x512 forward: reference %.1fms, factorised %.1fms, reset_noise %.3fms' %
+          (reference * 1000, factorised * 1000, reset * 1000))
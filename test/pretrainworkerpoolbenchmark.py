@@ -0,0 +1,45 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from optimizer.pretrainer import PreTrainer
+from optimizer.replaymemory import ReplayMemoryProxy
+from test.replaymemorybenchmark import memory_args
+
+
+def pre_train(settings, num_workers: int, dirname: str) -> ReplayMemoryProxy:
+    args = memory_args('float32')
+    args.offline_pre_train, args.offline_nodes, args.pre_train_workers = True, 1, num_workers
+    mem = ReplayMemoryProxy(args, 20000)
+
+    pre_trainer = PreTrainer(args, mem, None)
+    pre_trainer.memory_serializer.CHECKPOINT_DIRNAME = os.path.join(dirname, 'memory')
+    pre_trainer.MARK_FILENAME = os.path.join(dirname, 'mark')
+    pre_trainer._train_settings(settings)
+    return mem
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compares parallel pre-training with the sequential one.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of worker processes')
+    parser.add_argument('--files', type=int, default=8, help='Number of trace files replayed')
+    args = parser.parse_args()
+
+    settings = [(4, file_index) for file_index in range(args.files)]
+    stores, times = [], []
+    for num_workers in [1, args.workers]:
+        with tempfile.TemporaryDirectory() as dirname:
+            start = time.time()
+            store = pre_train(settings, num_workers, dirname).memory.transitions.data
+            times.append(time.time() - start)
+            stores.append(store)
+        print('workers: %d, time: %.2fs' % (num_workers, times[-1]))
+
+    sequential, parallel = stores
+    # Replays are reproducible, so both runs store the same transitions.
+    for name in ['timesteps', 'states', 'actions', 'rewards', 'nonterminals']:
+        assert np.array_equal(getattr(sequential, name), getattr(parallel, name)), name
+    print('Transitions are merged in episode order, speedup: %.2fx' % (times[0] / times[1]))
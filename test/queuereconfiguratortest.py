@@ -0,0 +1,137 @@
+import os
+import tempfile
+import threading
+import time
+import timeit
+
+from optimizer.environment.actionparser import ActionParser
+from optimizer.environment.yarn.queuereconfigurator import QueueReconfigurator
+from optimizer.environment.yarn.schedulerstrategy import CapacitySchedulerStrategy
+from optimizer.util.xmlmodifier import XmlModifier
+
+
+def reference_override_config(strategy: CapacitySchedulerStrategy, action_index: int, dest: str):
+    """The original override_config, re-parsing the template on every call."""
+    xml_modifier = XmlModifier(CapacitySchedulerStrategy.TEMPLATE, dest)
+    for queue_name, capacity in strategy.action_set[action_index].items():
+        xml_modifier.modify_kv_type('yarn.scheduler.capacity.root.%s.capacity' % queue_name, capacity)
+        xml_modifier.modify_kv_type('yarn.scheduler.capacity.root.%s.maximum-capacity' % queue_name,
+                                    CapacitySchedulerStrategy.MAXIMUM_CAPACITY)
+    xml_modifier.save()
+
+
+def template_test(dirname: str):
+    strategy = CapacitySchedulerStrategy('', dirname, ActionParser.parse())
+    reference_dest = os.path.join(dirname, 'reference.xml')
+    for action_index in strategy.action_set:
+        strategy.override_config(action_index)
+        reference_override_config(strategy, action_index, reference_dest)
+        with open(os.path.join(dirname, 'capacity-scheduler.xml')) as f, open(reference_dest) as g:
+            assert f.read() == g.read(), action_index
+
+    reference = timeit.timeit(lambda: reference_override_config(strategy, 1, reference_dest), number=20) / 20
+    rendered = timeit.timeit(lambda: [strategy.override_config(i) for i in (1, 2)], number=10) / 20
+    print('override_config: reference %.2fms, template %.3fms' % (reference * 1000, rendered * 1000))
+
+
+class RecordingApply(object):
+
+    def __init__(self, cost: float, succeeded: bool = True):
+        self.cost = cost
+        self.succeeded = succeeded
+        self.applied = []
+        self.lock = threading.Lock()
+
+    def __call__(self, action_index: int) -> bool:
+        time.sleep(self.cost)
+        with self.lock:
+            self.applied.append(action_index)
+        return self.succeeded
+
+
+def coalescing_test():
+    apply = RecordingApply(0.1)
+    reconfigurator = QueueReconfigurator(apply, debounce=0.05)
+
+    # A burst of actions is applied once, with the last action.
+    for action_index in [1, 2, 3, 4]:
+        reconfigurator.submit(action_index)
+    assert not reconfigurator.is_settled()
+    assert reconfigurator.wait(2)
+    assert apply.applied == [4] and reconfigurator.applied_action_index == 4
+
+    # Re-submitting the applied action does nothing.
+    reconfigurator.submit(4)
+    assert reconfigurator.is_settled()
+    time.sleep(0.2)
+    assert apply.applied == [4]
+
+    # Actions submitted during a refresh are coalesced into the next one.
+    reconfigurator.submit(5)
+    time.sleep(0.08)
+    reconfigurator.submit(6)
+    reconfigurator.submit(7)
+    assert reconfigurator.wait(2)
+    assert apply.applied == [4, 5, 7], apply.applied
+
+    # A config applied by other means, e.g. before SLS starts, counts as applied.
+    reconfigurator.mark_applied(2)
+    reconfigurator.submit(2)
+    assert reconfigurator.is_settled()
+
+
+def write_now_test():
+    apply = RecordingApply(0.2)
+    reconfigurator = QueueReconfigurator(apply, debounce=0.01)
+    written = []
+
+    # A config written during a refresh waits for it and wins over the older action.
+    reconfigurator.submit(1)
+    time.sleep(0.05)
+    reconfigurator.write_now(2, written.append)
+    assert apply.applied == [1] and written == [2]
+    assert reconfigurator.applied_action_index == 2 and reconfigurator.is_settled()
+
+    # A pending action superseded by a written config is never applied.
+    reconfigurator.submit(3)
+    reconfigurator.write_now(4, written.append)
+    time.sleep(0.1)
+    assert apply.applied == [1] and reconfigurator.applied_action_index == 4
+
+
+def shared_test():
+    apply = RecordingApply(0)
+    reconfigurator = QueueReconfigurator.shared('/cluster/a', apply, debounce=0.01)
+    # Communicators of one cluster, e.g. of training and evaluation, share its reconfigurator.
+    assert QueueReconfigurator.shared('/cluster/a', RecordingApply(0), debounce=0.01) is reconfigurator
+    assert QueueReconfigurator.shared('/cluster/b', apply, debounce=0.01) is not reconfigurator
+
+    reconfigurator.submit(1)
+    assert reconfigurator.wait(1)
+    # Once the default config is written back, the same action is applied again.
+    written = []
+    reconfigurator.reset(lambda: written.append('default'))
+    assert written == ['default'] and reconfigurator.applied_action_index is None
+    reconfigurator.submit(1)
+    assert reconfigurator.wait(1)
+    assert apply.applied == [1, 1]
+
+
+def backoff_test():
+    apply = RecordingApply(0, succeeded=False)
+    reconfigurator = QueueReconfigurator(apply, debounce=0.01, max_retry_delay=0.1)
+    reconfigurator.submit(1)
+    time.sleep(0.5)
+    # Retried after 0.02, 0.04, 0.08 and then every 0.1 seconds, not every debounce.
+    assert 4 <= len(apply.applied) <= 8, len(apply.applied)
+    assert not reconfigurator.is_settled() and reconfigurator.failures == len(apply.applied)
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as dirname:
+        template_test(dirname)
+    coalescing_test()
+    write_now_test()
+    shared_test()
+    backoff_test()
+    print('Queue reconfiguration tests passed.')
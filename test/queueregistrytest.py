@@ -0,0 +1,28 @@
+import timeit
+
+from optimizer.environment.yarn.queueregistry import QueueRegistry
+from optimizer.hyperparameters import QUEUES
+
+if __name__ == '__main__':
+    registry = QueueRegistry(QUEUES['names'])
+    for index, name in enumerate(QUEUES['names']):
+        # Same indices as the former QUEUES['names'].index(name), by leaf name or full path.
+        assert registry.index(name) == registry.index('root.' + name) == index
+        assert registry.path(name) == registry.path('root.' + name) == 'root.' + name
+
+    nested = QueueRegistry(['root.prod.etl', 'prod.adhoc', 'dev.etl'] + ['team%d' % i for i in range(500)])
+    assert nested.index('prod.etl') == nested.index('root.prod.etl') == 0
+    assert nested.index('adhoc') == 1
+    # "etl" is ambiguous between prod and dev, so it is treated as unknown.
+    assert nested.index('etl') >= 503 and nested.index('dev.etl') == 2
+    assert nested.index('team499') == 502
+
+    # Unknown queues get a stable bucket after the configured ones, the same one every time.
+    bucket = nested.index('root.unknown.queue')
+    assert 503 <= bucket < len(nested)
+    assert QueueRegistry(['x']).index('unknown.queue') - 1 == bucket - 503
+
+    names = ['team%d' % i for i in range(500)]
+    dict_lookup = timeit.timeit(lambda: [nested.index(n) for n in names], number=100) / 100
+    list_lookup = timeit.timeit(lambda: [names.index(n) for n in names], number=100) / 100
+    print('500 queue lookups: list.index %.3fms, registry %.3fms' % (list_lookup * 1000, dict_lookup * 1000))
@@ -0,0 +1,30 @@
+import random
+
+from optimizer.hyperparameters import QUEUES
+from optimizer.environment.yarn.yarnmodel import *
+
+
+def random_request_resources(max_requests: int) -> List[ApplicationRequestResource]:
+    return [ApplicationRequestResource(random.randint(0, 20), random.choice([1024, 2048, 6144]), random.randint(1, 8))
+            for _ in range(random.randint(0, max_requests))]
+
+
+def random_state(num_waiting_apps: int, num_running_apps: int, num_nodes: int, seed: int = 0) -> State:
+    random.seed(seed)
+    queue_names = QUEUES['names']
+
+    waiting_apps = [
+        WaitingApplication(random.randint(0, 10 ** 7), random.randint(0, 10), random.choice(queue_names),
+                           random_request_resources(64))
+        for _ in range(num_waiting_apps)
+    ]
+    running_apps = [
+        RunningApplication('application_0_%04d' % i, random.randint(0, 10 ** 7), random.randint(0, 10),
+                           random.choice(queue_names), random.random() * 100, random.random() * 100,
+                           random.randint(0, 10 ** 9), random_request_resources(64))
+        for i in range(num_running_apps)
+    ]
+    resources = [Resource(random.randint(1, 64), random.randint(1, 512)) for _ in range(num_nodes)]
+    constraints = [QueueConstraint(name, random.random() * 100, random.random() * 100, random.random() * 100)
+                   for name in queue_names]
+    return State(waiting_apps, running_apps, resources, constraints)
@@ -0,0 +1,51 @@
+import argparse
+import time
+
+import psutil
+import torch
+
+from optimizer.hyperparameters import STATE_SHAPE
+from optimizer.replaymemory.memory import ReplayMemory
+
+
+def memory_args(state_dtype: str) -> argparse.Namespace:
+    return argparse.Namespace(device=torch.device('cpu'), history_length=4, discount=0.99, multi_step=3,
+                              priority_weight=0.4, priority_exponent=0.5, memory_state_dtype=state_dtype,
+                              global_weight_normalisation=False)
+
+
+def footprint(capacity: int, state_dtype: str) -> int:
+    state_bytes = {'float32': 4, 'float16': 2}[state_dtype] * STATE_SHAPE[0] * STATE_SHAPE[1]
+    # timestep, action, reward, nonterminal and the sum tree
+    return capacity * (state_bytes + 8 + 8 + 4 + 1 + 2 * 4)
+
+
+def fill(mem: ReplayMemory, num: int, episode_length: int = 288):
+    for i in range(num):
+        state = torch.rand(4, *STATE_SHAPE) * 10 ** (i % 8)
+        mem.append(state, i % 10, 1.0, (i + 1) % episode_length == 0)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks replay memory footprint and sample() latency.')
+    parser.add_argument('--fill', type=int, default=2000, help='Number of transitions appended before sampling')
+    parser.add_argument('--batch-size', type=int, default=32, help='Batch size')
+    parser.add_argument('--repeat', type=int, default=50, help='Number of sampled batches')
+    args = parser.parse_args()
+
+    print('{:>9} {:>8} {:>12} {:>12}'.format('capacity', 'dtype', 'footprint', 'sample()'))
+    for capacity in [10 ** 4, 10 ** 5, 10 ** 6]:
+        for state_dtype in ['float32', 'float16']:
+            size = footprint(capacity, state_dtype)
+            if size > psutil.virtual_memory().available / 2:
+                print('{:>9} {:>8} {:>10.1f}GB {:>12}'.format(capacity, state_dtype, size / 2 ** 30, 'no memory'))
+                continue
+
+            mem = ReplayMemory(memory_args(state_dtype), capacity)
+            fill(mem, min(args.fill, capacity))
+            start = time.time()
+            for _ in range(args.repeat):
+                mem.sample(args.batch_size)
+            latency = (time.time() - start) / args.repeat
+            print('{:>9} {:>8} {:>10.1f}GB {:>10.2f}ms'.format(capacity, state_dtype, size / 2 ** 30, latency * 1000))
+            del mem
@@ -0,0 +1,34 @@
+import tempfile
+import xml.etree.ElementTree as ElementTree
+
+from optimizer.environment.actionparser import ActionParser
+from optimizer.environment.yarn.schedulerstrategy import CapacitySchedulerStrategy
+from optimizer.util.httpclient import HttpClient
+
+from test.stubresourcemanager import StubResourceManager
+
+if __name__ == '__main__':
+    with StubResourceManager() as rm, tempfile.TemporaryDirectory() as dirname:
+        strategy = CapacitySchedulerStrategy(rm.url, dirname, ActionParser.parse())
+        client = HttpClient()
+
+        assert strategy.mutate_config(9, client)
+        path, body = rm.put_requests[-1]
+        assert path == '/ws/v1/cluster/scheduler-conf', path
+        updates = {}
+        for update in ElementTree.fromstring(body).findall('update-queue'):
+            params = {e.find('key').text: float(e.find('value').text) for e in update.find('params')}
+            updates[update.find('queue-name').text] = params
+        for queue_name, capacity in strategy.action_set[9].items():
+            assert updates['root.' + queue_name] == {'capacity': capacity,
+                                                     'maximum-capacity': strategy.MAXIMUM_CAPACITY}, updates
+
+        # RM without a mutable conf store rejects the change, callers fall back to rmadmin.
+        rm.put_status = 400
+        assert not strategy.mutate_config(8, client)
+
+        rm.put_status, rm.put_delay = 200, 0.05
+        assert strategy.mutate_config(7, client)
+        assert len(strategy.mutation_latencies) == 3 and strategy.mutation_latencies[-1] >= 0.05
+        print('Mutation latencies: %s' % ', '.join('%.1fms' % (t * 1000) for t in strategy.mutation_latencies))
+        client.close()
@@ -0,0 +1,89 @@
+import random
+import time
+
+import numpy as np
+
+from optimizer.replaymemory.segmenttree import SegmentTree
+
+
+class ReferenceSegmentTree(object):
+    """The original recursive sum tree."""
+
+    def __init__(self, size):
+        self.size = size
+        self.sum_tree = np.zeros((2 * size - 1, ), dtype=np.float32)
+
+    def _propagate(self, index, value):
+        parent = (index - 1) // 2
+        left, right = 2 * parent + 1, 2 * parent + 2
+        self.sum_tree[parent] = self.sum_tree[left] + self.sum_tree[right]
+        if parent != 0:
+            self._propagate(parent, value)
+
+    def update(self, index, value):
+        self.sum_tree[index] = value
+        self._propagate(index, value)
+
+    def _retrieve(self, index, value):
+        left, right = 2 * index + 1, 2 * index + 2
+        if left >= len(self.sum_tree):
+            return index
+        elif value <= self.sum_tree[left]:
+            return self._retrieve(left, value)
+        else:
+            return self._retrieve(right, value - self.sum_tree[left])
+
+    def find(self, value):
+        index = self._retrieve(0, value)
+        return self.sum_tree[index], index - self.size + 1, index
+
+
+def property_test(num_cases: int = 200):
+    for case in range(num_cases):
+        rng = random.Random(case)
+        size = rng.randint(2, 300)
+        tree, reference = SegmentTree(size), ReferenceSegmentTree(size)
+        leaves = {}
+        for _ in range(rng.randint(1, 20)):
+            indices = [rng.randrange(size) + size - 1 for _ in range(rng.randint(1, 64))]
+            values = [rng.choice([0.0, rng.random(), rng.random() * 100]) for _ in indices]
+            if rng.random() < 0.5:
+                tree.update_batch(indices, values)
+            else:
+                for index, value in zip(indices, values):
+                    tree.update(index, value)
+            for index, value in zip(indices, values):
+                reference.update(index, value)
+                leaves[index] = np.float32(value)
+
+            assert np.array_equal(tree.sum_tree, reference.sum_tree), case
+            assert tree.min() == min(leaves.values()), case
+            for value in [rng.random() * float(reference.sum_tree[0]) for _ in range(20)]:
+                assert tree.find(value)[1:] == reference.find(value)[1:], case
+                assert tuple(a[0] for a in tree.find_batch([value])[1:]) == reference.find(value)[1:], case
+
+
+def benchmark(size: int, batch_size: int = 32, repeat: int = 1000):
+    tree, reference = SegmentTree(size), ReferenceSegmentTree(size)
+    batches = [(np.random.randint(size, size=batch_size) + size - 1, np.random.rand(batch_size).astype(np.float32))
+               for _ in range(repeat)]
+
+    start = time.time()
+    for indices, values in batches:
+        [reference.update(index, value) for index, value in zip(indices, values)]
+    reference_cost = (time.time() - start) / repeat
+
+    start = time.time()
+    for indices, values in batches:
+        tree.update_batch(indices, values)
+    batch_cost = (time.time() - start) / repeat
+    print('{:>9} {:>10.3f}ms {:>10.3f}ms'.format(size, reference_cost * 1000, batch_cost * 1000))
+
+
+if __name__ == '__main__':
+    property_test()
+    print('Property test passed.')
+
+    print('{:>9} {:>12} {:>12}'.format('capacity', 'update', 'update_batch'))
+    for capacity in [10 ** 4, 10 ** 5, 10 ** 6]:
+        benchmark(capacity)
@@ -0,0 +1,31 @@
+import glob
+
+from optimizer.environment.actionparser import ActionParser
+from optimizer.environment.yarn.schedulerstrategy import CapacitySchedulerStrategy
+from optimizer.environment.yarn.slstracereplayer import SlsJob, SlsTask, SlsTraceReplayer, read_sls_jobs
+from optimizer.hyperparameters import QUEUES
+
+if __name__ == '__main__':
+    capacities = list(CapacitySchedulerStrategy.convert_weight_to_capacity(ActionParser.parse()).values())
+
+    # Jobs submitted at once must not take every container with their AMs.
+    jobs = [SlsJob('job_%d' % i, 'queueA', 0, [SlsTask(0, 1000, 20)]) for i in range(20)]
+    replayer = SlsTraceReplayer(jobs, capacities[0], CapacitySchedulerStrategy.MAXIMUM_CAPACITY)
+    replayer.advance(0)
+    assert 0 < replayer.ams < replayer.total_containers
+    replayer.run()
+    assert replayer.is_done() and not replayer.is_stalled()
+
+    # Every shipped trace completes on one node under every action.
+    for filename in sorted(glob.glob('data/trainingset/sls-jobs*.json')):
+        jobs = read_sls_jobs(filename)
+        for action in capacities:
+            replayer = SlsTraceReplayer(jobs, action, CapacitySchedulerStrategy.MAXIMUM_CAPACITY)
+            replayer.run()
+            assert replayer.num_finished == len(jobs), (filename, action)
+
+    # A replay that cannot progress ends instead of running forever.
+    replayer = SlsTraceReplayer(jobs, {name: 0 for name in QUEUES['names']}, 0)
+    replayer.run()
+    assert replayer.is_stalled() and replayer.is_done()
+    print('Every trace completes.')
@@ -0,0 +1,80 @@
+import argparse
+import random
+import time
+
+from optimizer.environment.spark.sparkapplicationbuilder import SparkApplicationBuilder
+
+from test.stubresourcemanager import StubResourceManager
+
+APPLICATION_ID = 'application_1562834622700_0051'
+PREFIX = '/api/v1/applications/%s/1/' % APPLICATION_ID
+
+
+def synthetic_fixture(num_jobs: int, stages_per_job: int, tasks_per_stage: int) -> dict:
+    """Responses shaped like those of Spark History Server 2.4 for one ML workload."""
+    random.seed(0)
+    fixture = {
+        PREFIX: {'startTime': '2019-07-11T08:00:00.000GMT'},
+        PREFIX + 'allexecutors': [{'id': 'driver'}] + [
+            {'id': str(i), 'isActive': True, 'addTime': '2019-07-11T08:00:%02d.000GMT' % i, 'maxMemory': 3 * 1024 ** 3}
+            for i in range(1, 9)
+        ],
+    }
+
+    jobs, stage_id, task_id = [], 0, 0
+    for job_id in range(num_jobs):
+        stage_ids = list(range(stage_id, stage_id + stages_per_job))
+        jobs.append({'jobId': job_id, 'name': 'job-%d' % job_id, 'stageIds': stage_ids})
+        for stage_id in stage_ids:
+            fixture[PREFIX + 'stages/%d' % stage_id] = [{
+                'stageId': stage_id, 'numTasks': tasks_per_stage,
+                'inputBytes': tasks_per_stage * 2 ** 27, 'name': 'stage-%d' % stage_id,
+            }]
+            tasks = []
+            for _ in range(tasks_per_stage):
+                tasks.append({
+                    'taskId': task_id, 'launchTime': '2019-07-11T08:01:00.000GMT',
+                    'duration': random.randint(1000, 5000), 'host': 'node%d' % random.randint(1, 8),
+                    'taskMetrics': {'inputMetrics': {'bytesRead': 2 ** 27}},
+                })
+                task_id += 1
+            fixture[PREFIX + 'stages/%d/0/taskList' % stage_id] = tasks
+        stage_id += 1
+    jobs.reverse()
+    fixture[PREFIX + 'jobs'] = jobs
+    return fixture
+
+
+def timed_build(url: str, **kwargs):
+    builder = SparkApplicationBuilder(url, **kwargs)
+    start = time.time()
+    app = builder.build(APPLICATION_ID)
+    cost = time.time() - start
+    builder.http_client.close()
+    return app, cost
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks SparkApplicationBuilder against a stub History Server.')
+    parser.add_argument('--fixture', type=str, help='Recorded responses, a JSON object from request path to body')
+    parser.add_argument('--latency', type=float, default=0.02, help='Latency of each request in seconds')
+    args = parser.parse_args()
+
+    with StubResourceManager() as shs:
+        if args.fixture:
+            shs.load_fixture(args.fixture, args.latency)
+        else:
+            for path, body in synthetic_fixture(12, 10, 400).items():
+                shs.add_route(path, body, args.latency)
+        url = shs.url + 'api/v1/'
+
+        # One worker and one page per stage is what the sequential crawl did.
+        sequential_app, sequential_cost = timed_build(url, max_parallelism=1, task_page_size=10 ** 9)
+        requests_before = shs.request_count
+        parallel_app, parallel_cost = timed_build(url)
+
+        assert sequential_app == parallel_app, 'Crawled applications differ.'
+        print('Stages: %d, requests: %d' % (sum(len(j.stages) for j in parallel_app.jobs),
+                                             shs.request_count - requests_before))
+        print('Sequential: %.3fs, parallel: %.3fs, speedup: %.1fx' % (
+            sequential_cost, parallel_cost, sequential_cost / parallel_cost))
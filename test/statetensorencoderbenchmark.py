@@ -0,0 +1,67 @@
+import timeit
+
+import torch
+
+from optimizer.hyperparameters import STATE_SHAPE
+from optimizer.environment.yarn.statetensorencoder import StateTensorEncoder
+from optimizer.environment.yarn.yarnmodel import State
+
+from test.randomstate import random_state
+
+
+def reference_build_tensor(raw: State):
+    """
+    The original row-by-row StateBuilder.build_tensor. Running apps keep
+    64 resource requests, the 65th never fitted into a 200-wide row.
+    """
+    height, width = STATE_SHAPE
+    tensor = torch.zeros(height, width)
+
+    for i, wa in enumerate(raw.waiting_apps[:75]):
+        line = [wa.elapsed_time, wa.priority, wa.converted_location]
+        for rr in wa.request_resources[:64]:
+            line.extend([rr.priority, rr.memory, rr.cpu])
+        line.extend([0.0] * (width - len(line)))
+        tensor[i] = torch.Tensor(line)
+
+    for i, ra in enumerate(raw.running_apps[:75]):
+        row = i + 75
+        line = [ra.elapsed_time, ra.priority, ra.converted_location,
+                ra.progress, ra.queue_usage_percentage, ra.predicted_time_delay]
+        for rr in ra.request_resources[:64]:
+            line.extend([rr.priority, rr.memory, rr.cpu])
+        line.extend([0.0] * (width - len(line)))
+        tensor[row] = torch.Tensor(line)
+
+    row, idx = 150, 0
+    for r in raw.resources[:4900]:
+        tensor[row][idx] = r.mem
+        idx += 1
+        tensor[row][idx] = r.vcore_num
+        idx += 1
+        if idx == width:
+            row += 1
+            idx = 0
+
+    row, queue_constraints = 199, []
+    for c in raw.constraints[:50]:
+        queue_constraints.extend([c.converted_name, c.capacity, c.max_capacity, c.used_capacity])
+    queue_constraints.extend([0.0] * (width - len(queue_constraints)))
+    tensor[row] = torch.Tensor(queue_constraints)
+
+    return tensor
+
+
+if __name__ == '__main__':
+    encoder = StateTensorEncoder()
+
+    print('{:>8} {:>8} {:>8} {:>12} {:>12} {:>8}'.format('waiting', 'running', 'nodes', 'reference', 'encoder', 'speedup'))
+    for num_waiting, num_running, num_nodes in [(0, 0, 0), (10, 10, 100), (75, 75, 1000), (300, 300, 5000)]:
+        state = random_state(num_waiting, num_running, num_nodes)
+        assert torch.equal(reference_build_tensor(state), encoder.encode(state)), 'Encoded tensors differ.'
+
+        number = 20
+        reference = timeit.timeit(lambda: reference_build_tensor(state), number=number) / number
+        vectorized = timeit.timeit(lambda: encoder.encode(state), number=number) / number
+        print('{:>8} {:>8} {:>8} {:>10.3f}ms {:>10.3f}ms {:>7.1f}x'.format(
+            num_waiting, num_running, num_nodes, reference * 1000, vectorized * 1000, reference / vectorized))
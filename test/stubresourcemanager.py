@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubResourceManager(object):
+    """
+    A local HTTP server which answers canned JSON for RM/History Server
+    REST endpoints, optionally after a delay.
+    Routes are matched on the full path including the query string first,
+    then on the bare path. List bodies matched on the bare path are sliced
+    by offset/length query parameters like Spark History Server does.
+    PUT requests, like scheduler-conf mutations, are recorded and answered
+    with put_status.
+    """
+
+    def __init__(self, routes: Dict[str, Tuple[object, float]] = None):
+        self.routes = routes or {}
+        self.request_count = 0
+        # (path, body) of every PUT request
+        self.put_requests = []
+        self.put_status = 200
+        self.put_delay = 0.0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                stub.request_count += 1
+                body, delay = stub.resolve(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+
+                time.sleep(delay)
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_PUT(self):
+                stub.request_count += 1
+                length = int(self.headers.get('Content-Length', 0))
+                stub.put_requests.append((self.path, self.rfile.read(length).decode('utf-8')))
+                time.sleep(stub.put_delay)
+
+                data = b'Configuration change successfully applied.'
+                self.send_response(stub.put_status)
+                self.send_header('Content-Type', 'text/plain')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return 'http://127.0.0.1:%d/' % self.server.server_address[1]
+
+    def add_route(self, path: str, body, delay: float = 0.0):
+        self.routes[path] = (body, delay)
+
+    def load_fixture(self, filename: str, delay: float = 0.0):
+        """Loads recorded responses, a JSON object from request path to body."""
+        with open(filename) as f:
+            for path, body in json.load(f).items():
+                self.add_route(path, body, delay)
+
+    def resolve(self, path: str):
+        if path in self.routes:
+            return self.routes[path]
+
+        parts = urlsplit(path)
+        if parts.path not in self.routes:
+            return None, 0.0
+
+        body, delay = self.routes[parts.path]
+        if isinstance(body, list):
+            query = parse_qs(parts.query)
+            offset = int(query.get('offset', [0])[0])
+            length = int(query.get('length', [20])[0])
+            body = body[offset:offset + length]
+        return body, delay
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,50 @@
+import argparse
+import time
+import tracemalloc
+
+import psutil
+import torch
+
+from optimizer.nn import ARCHITECTURES, soft_update
+from test.dqnbenchmark import dqn_args
+
+
+def load_state_dict_sync(target: torch.nn.Module, online: torch.nn.Module):
+    """The original sync, copying every parameter and buffer through a state dict."""
+    target.load_state_dict(online.state_dict())
+
+
+def measure(sync, repeat: int):
+    """:return: seconds per sync, peak Python allocation and RSS growth in bytes."""
+    rss = psutil.Process().memory_info().rss
+    tracemalloc.start()
+    start = time.time()
+    for _ in range(repeat):
+        sync()
+    elapsed = (time.time() - start) / repeat
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, psutil.Process().memory_info().rss - rss
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compares target network sync time and memory.')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed syncs')
+    args = parser.parse_args()
+
+    print('{:>10} {:>16} {:>10} {:>12} {:>12}'.format('network', 'sync', 'time', 'py peak', 'rss growth'))
+    for architecture, dqn_class in ARCHITECTURES.items():
+        online, target = dqn_class(dqn_args(architecture), 10), dqn_class(dqn_args(architecture), 10)
+        syncs = {
+            'load_state_dict': lambda: load_state_dict_sync(target, online),
+            'soft_update τ=1': lambda: soft_update(target, online, 1),
+            'soft_update τ=.01': lambda: soft_update(target, online, 0.01),
+        }
+        for name, sync in syncs.items():
+            elapsed, peak, rss = measure(sync, args.repeat)
+            print('{:>10} {:>16} {:>8.1f}ms {:>10.1f}KB {:>10.1f}MB'.format(
+                architecture, name, elapsed * 1000, peak / 1024, rss / 2 ** 20))
+
+        soft_update(target, online, 1)
+        for p, q in zip(target.parameters(), online.parameters()):
+            assert torch.equal(p, q)
@@ -0,0 +1,42 @@
+import argparse
+import os
+import random
+import time
+
+import torch
+
+from optimizer.environment import TraceReplayEnv, VectorEnv
+
+
+def env_args() -> argparse.Namespace:
+    return argparse.Namespace(device=torch.device('cpu'), history_length=4, offline_nodes=1, seed=123,
+                              max_episode_length=2880)
+
+
+def throughput(num_envs: int, num_steps: int) -> float:
+    envs = VectorEnv(TraceReplayEnv, env_args(), num_envs)
+    action_space = envs.action_space()
+    states = envs.reset()
+    assert states.shape[0] == num_envs
+
+    start = time.time()
+    for _ in range(num_steps):
+        states, rewards, dones, invalids = envs.step([random.randrange(action_space) for _ in range(num_envs)])
+    elapsed = time.time() - start
+    envs.close()
+    return num_envs * num_steps / elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measures transitions per second of parallel trace replaying environments.')
+    parser.add_argument('--steps', type=int, default=200, help='Number of vector steps')
+    parser.add_argument('--max-envs', type=int, default=os.cpu_count(), help='Largest number of environments')
+    args = parser.parse_args()
+
+    print('{:>6} {:>16} {:>8}'.format('envs', 'transitions/s', 'scaling'))
+    num_envs, base = 1, None
+    while num_envs <= args.max_envs:
+        rate = throughput(num_envs, args.steps)
+        base = base or rate
+        print('{:>6} {:>16.1f} {:>7.2f}x'.format(num_envs, rate, rate / base))
+        num_envs *= 2
@@ -0,0 +1,89 @@
+import argparse
+import dataclasses
+import random
+import time
+import tracemalloc
+from typing import List
+
+from optimizer.hyperparameters import QUEUES
+from optimizer.environment.yarn.statebuilder import StateBuilder
+from optimizer.environment.yarn.yarnmodel import WaitingApplication
+
+
+@dataclasses.dataclass
+class ReferenceApplicationRequestResource(object):
+    priority: int
+    memory: int
+    cpu: int
+
+
+@dataclasses.dataclass
+class ReferenceWaitingApplication(object):
+    """The original WaitingApplication, with an instance __dict__ per app."""
+    elapsed_time: int
+    priority: int
+    location: str
+    request_resources: List[ReferenceApplicationRequestResource] = dataclasses.field(default_factory=list)
+
+
+def reference_build_waiting_apps_from_json(j: dict) -> List[ReferenceWaitingApplication]:
+    apps = []
+    for app in j['apps']['app']:
+        request_resources = []
+        for req in app.get('resourceRequests', []):
+            capability = req['capability']
+            request_resources.append(ReferenceApplicationRequestResource(req['priority'], capability['memory'],
+                                                                         capability['vCores']))
+        apps.append(ReferenceWaitingApplication(app['elapsedTime'], app['priority'], app['queue'], request_resources))
+    return apps
+
+
+def build_waiting_apps_from_json(j: dict) -> List[WaitingApplication]:
+    # StateBuilder.build_waiting_apps_from_json does not touch the builder's state.
+    return StateBuilder.build_waiting_apps_from_json(None, j)
+
+
+def random_apps_json(num_apps: int, max_requests: int, seed: int = 0) -> dict:
+    random.seed(seed)
+    return {'apps': {'app': [{
+        'elapsedTime': random.randint(0, 10 ** 7),
+        'priority': random.randint(0, 10),
+        'queue': random.choice(QUEUES['names']),
+        'resourceRequests': [{
+            'priority': random.randint(0, 20),
+            'capability': {'memory': random.choice([1024, 2048, 6144]), 'vCores': random.randint(1, 8)},
+        } for _ in range(random.randint(0, max_requests))],
+    } for _ in range(num_apps)]}}
+
+
+def measure(build, j: dict):
+    """Returns (seconds, bytes) taken by building the apps of j once."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    apps = build(j)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del apps
+    return elapsed, size
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reports build time and memory of YARN models for many apps.')
+    parser.add_argument('--max-requests', type=int, default=8, help='Maximum resource requests per app')
+    args = parser.parse_args()
+
+    print('{:>8} {:>12} {:>12} {:>12} {:>12}'.format('apps', 'reference', 'slotted', 'reference', 'slotted'))
+    for num_apps in [100, 1000, 10000]:
+        j = random_apps_json(num_apps, args.max_requests)
+        reference, slotted = reference_build_waiting_apps_from_json(j), build_waiting_apps_from_json(j)
+        assert [(a.elapsed_time, a.priority, a.location, [dataclasses.astuple(rr) for rr in a.request_resources])
+                for a in reference] == \
+               [(a.elapsed_time, a.priority, a.location, [tuple(rr) for rr in a.request_resources])
+                for a in slotted], 'Built apps differ.'
+        del reference, slotted
+
+        reference_time, reference_size = measure(reference_build_waiting_apps_from_json, j)
+        slotted_time, slotted_size = measure(build_waiting_apps_from_json, j)
+        print('{:>8} {:>10.2f}ms {:>10.2f}ms {:>10.0f}KB {:>10.0f}KB'.format(
+            num_apps, reference_time * 1000, slotted_time * 1000, reference_size / 1024, slotted_size / 1024))